@@ -1,10 +1,10 @@
-from src.processors.editor import VideoEditor
-from src.processors.downloader import VideoDownloader
+# only lightweight modules are imported up front, the ones pulling in
+# googleapiclient, yt_dlp and requests are imported by the command using them
+# so --help, --clean and --reset start instantly. check with
+# `python scripts/import_benchmark.py`
 from src.config import ConfigLoader
 from src.logger import Logger, LoggingLevel
-from src.uploader.youtube_uploader import YouTubeUploader
-from src.uploader.uploader import Uploader
-from src.utils import print_title, is_valid_url
+from src.utils import print_title
 from src.help import is_help_arg_passed, print_help
 import src.cleaner as cleaner
 import src.randomizer as randomizer
@@ -42,35 +42,31 @@ def main():
     config_loader.check_for_ffmpeg(logger=logger)
     config_loader.check_for_yt_dlp(logger=logger)
 
+    from src.processors.downloader import VideoDownloader
+    from src.uploader.youtube_uploader import YouTubeUploader
+    from src.uploader.uploader import Uploader
+    from src.pipeline import Pipeline
+
     youtube_uploader = YouTubeUploader(logger=logger, config_loader=config_loader)
 
     youtube_uploader.authenticate()
 
     video_downloader = VideoDownloader(logger=logger, configLoader=config_loader)
 
-    links = video_downloader.get_links_from_file()
-
-    for index, link in enumerate(links):
-        if index == len(links) - 1:
-            break
-
-        if not is_valid_url(link):
-            logger.log_file_with_stdout(
-                f"Not a valid url [ {link} ]. Skipping...", LoggingLevel.Info
-            )
-            continue
-
-        video_downloader.download_video_using_pkg(link)
-
-        video_editor = VideoEditor(link=link, logger=logger, configLoader=config_loader)
-
-        video_editor.edit()
+    links = video_downloader.get_video_links()
 
     uploader = Uploader(
         logger=logger, config_loader=config_loader, youtube_uploader=youtube_uploader
     )
 
-    uploader.start_uploading_to_youtube()
+    pipeline = Pipeline(
+        logger=logger,
+        config_loader=config_loader,
+        video_downloader=video_downloader,
+        uploader=uploader,
+    )
+
+    pipeline.run(links)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+"""Import time of the CLI entry point, measured with `python -X importtime`.
+
+Housekeeping commands (--help, --clean, --reset) run often from cron and
+must not pay for the heavy dependencies only the pipeline uses. This imports
+main.py in a fresh interpreter, prints the slowest imports and fails when
+one of the heavy packages got imported at startup.
+
+    python scripts/import_benchmark.py [--top 15] [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# packages only the download/edit/upload commands may load
+HEAVY_PACKAGES = (
+    "googleapiclient",
+    "google_auth_oauthlib",
+    "google_auth_httplib2",
+    "httplib2",
+    "yt_dlp",
+    "requests",
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_imports() -> dict[str, tuple[int, int]]:
+    """Self and cumulative import time in microseconds of every module"""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True,
+        cwd=ROOT,
+        check=True,
+        text=True,
+    )
+
+    timings: dict[str, tuple[int, int]] = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # the header line
+            continue
+
+        timings[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure_imports() for _ in range(max(args.runs, 1))]
+    totals = [timings["main"][1] for timings in runs]
+    timings = runs[-1]
+
+    print(
+        f"import main: median {statistics.median(totals) / 1000:.1f} ms, "
+        f"min {min(totals) / 1000:.1f} ms over {len(runs)} runs\n"
+    )
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    slowest = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)
+    for module, (self_us, cumulative_us) in slowest[: args.top]:
+        print(f"{cumulative_us / 1000:>9.1f} ms {self_us / 1000:>7.1f} ms  {module}")
+
+    heavy = sorted(module for module in timings if module in HEAVY_PACKAGES)
+    if heavy:
+        print(f"\nHeavy packages imported at startup: {', '.join(heavy)}")
+        return 1
+
+    print("\nNo heavy package is imported at startup")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
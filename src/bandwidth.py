@@ -0,0 +1,123 @@
+import threading
+import time
+
+from src.config import ConfigLoader
+from src.logger import Logger, LoggingLevel
+import src.utils as utils
+
+
+class TokenBucket:
+    """Blocks callers so the bytes they move average out to `rate` per second.
+
+    The bucket holds up to one second worth of tokens, so short bursts go
+    through untouched while sustained transfers are paced. A rate of 0 means
+    unlimited, consume() then only counts the bytes.
+    """
+
+    def __init__(self, rate: int):
+        self.rate = rate
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.updated_at = time.monotonic()
+        self.transferred = 0
+        self.lock = threading.Lock()
+
+    def consume(self, size: int):
+        if size <= 0:
+            return
+
+        with self.lock:
+            if not self.rate:
+                self.transferred += size
+                return
+
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+            # going into debt keeps chunks larger than the bucket working,
+            # the caller just waits for the debt to be paid back
+            self.tokens -= size
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if wait:
+            time.sleep(wait)
+
+        with self.lock:
+            self.transferred += size
+
+
+class BandwidthGovernor:
+    """Ingress and egress budgets shared by every download and upload worker"""
+
+    def __init__(
+        self,
+        logger: Logger,
+        ingress_rate: int,
+        egress_rate: int,
+        report_interval: float = 10,
+    ):
+        self.logger = logger
+        self.ingress = TokenBucket(ingress_rate)
+        self.egress = TokenBucket(egress_rate)
+        self.report_interval = report_interval
+        self.lock = threading.Lock()
+        self.last_report = time.monotonic()
+        self.last_transferred = (0, 0)
+
+    def consume_ingress(self, size: int):
+        self.ingress.consume(size)
+        self.report_utilization()
+
+    def consume_egress(self, size: int):
+        self.egress.consume(size)
+        self.report_utilization()
+
+    def report_utilization(self):
+        with self.lock:
+            now = time.monotonic()
+            elapsed = now - self.last_report
+            if elapsed < self.report_interval:
+                return
+
+            transferred = (self.ingress.transferred, self.egress.transferred)
+            ingress_speed = (transferred[0] - self.last_transferred[0]) / elapsed
+            egress_speed = (transferred[1] - self.last_transferred[1]) / elapsed
+            self.last_report = now
+            self.last_transferred = transferred
+
+        self.logger.log_file_with_stdout(
+            f"bandwidth ingress {self.describe(ingress_speed, self.ingress.rate)}, "
+            f"egress {self.describe(egress_speed, self.egress.rate)}",
+            LoggingLevel.Info,
+        )
+
+    def describe(self, speed: float, rate: int) -> str:
+        if not rate:
+            return f"{utils.format_bytes(speed)}/s (unlimited)"
+        return (
+            f"{utils.format_bytes(speed)}/s of {utils.format_bytes(rate)}/s "
+            f"({speed / rate:.0%})"
+        )
+
+
+_governor: None | BandwidthGovernor = None
+_governor_lock = threading.Lock()
+
+
+def get_bandwidth_governor(
+    config_loader: ConfigLoader, logger: Logger
+) -> BandwidthGovernor:
+    """Returns the process wide governor with the configured budgets"""
+    global _governor
+
+    with _governor_lock:
+        if _governor is None:
+            _governor = BandwidthGovernor(
+                logger=logger,
+                ingress_rate=config_loader.get_ingress_bandwidth(),
+                egress_rate=config_loader.get_egress_bandwidth(),
+            )
+
+        return _governor
@@ -49,7 +49,7 @@ def start_cleaner(config_loader: config.ConfigLoader) -> int:
     print(f"Passed Args: {sys.argv}")
     print("Starting cleaner")
 
-    files_dir = "files"
+    files_dir = config_loader.get_scratch_directory()
     output_dir = config_loader.get_output_directory()
 
     if os.path.exists(output_dir) and os.path.isdir(output_dir):
@@ -2,18 +2,32 @@ from enum import Enum
 import os
 from pathlib import Path
 import json
-import subprocess
+import sys
+import threading
 
 from src.logger import Logger, LoggingLevel
+from src.toolchain import Toolchain
 import src.utils as utils
 
+# values of these keys can also be nested under "performance" in config.json
+PERFORMANCE_SECTION = "performance"
+# MOZART_UPLOAD_WORKERS=4 overrides upload-workers
+ENV_PREFIX = "MOZART_"
+# --set upload-workers=4 overrides upload-workers, above the environment
+CLI_SET_FLAG = "--set"
+
 
 class ConfigLoader:
     def __init__(self, logger: Logger):
         self.pwd = Path().cwd()
         self.default_config_path = f"{self.pwd}/config.json"
         self.config_data = None
+        self.settings: dict[ConfigParams, object] = {}
+        self.sources: dict[ConfigParams, str] = {}
         self.is_windows = utils.is_windows()
+        self.logger = logger
+        self.toolchain: None | Toolchain = None
+        self.toolchain_lock = threading.Lock()
 
         logger.log_file_with_stdout(
             message="Searching config.json", level=LoggingLevel.Info
@@ -25,7 +39,10 @@ class ConfigLoader:
                 self.config_data = config
                 logger.log_file_with_stdout("Found config.json", LoggingLevel.Info)
 
-                asset_video_path = self.config_data[ConfigParams.ASSET_VIDEO_PATH.value]
+                self.load_settings(config, parse_cli_overrides())
+                self.log_effective_config(logger)
+
+                asset_video_path = self.get_asset_video_path()
                 if asset_video_path and os.path.exists(asset_video_path):
                     logger.log_file_with_stdout(
                         "Asset video file found.", LoggingLevel.Info
@@ -36,7 +53,7 @@ class ConfigLoader:
                     )
                     exit()  # exiting
 
-                output_dir = self.config_data[ConfigParams.OUTPUT_DIRECTORY.value]
+                output_dir = self.get_output_directory()
                 if output_dir and os.path.exists(output_dir):
                     logger.log_file_with_stdout(
                         "Output directory exists", LoggingLevel.Info
@@ -51,7 +68,7 @@ class ConfigLoader:
                         "Created Output directory", LoggingLevel.Info
                     )
 
-                links_file = self.config_data[ConfigParams.LINKS_FILE_PATH.value]
+                links_file = self.get_links_file_path()
                 if links_file and os.path.exists(links_file):
                     logger.log_file_with_stdout("Links File exists", LoggingLevel.Info)
                 else:
@@ -80,167 +97,294 @@ class ConfigLoader:
             )
             exit()
 
-    def get_ffmpeg_path(self):
-        if self.config_data[ConfigParams.FFMPEG_PATH.value]:
-            return self.config_data[ConfigParams.FFMPEG_PATH.value]
-        else:
-            return "ffmpeg"
+    def load_settings(self, config: dict, cli_overrides: dict[str, str]):
+        """Validates every key of CONFIG_SCHEMA into self.settings.
+
+        Later sources win: the default, the top level of config.json, its
+        performance section, a MOZART_* environment variable and finally
+        `--set key=value` on the command line.
+        """
+        performance = config.get(PERFORMANCE_SECTION) or {}
+        known_keys = {param.value for param in CONFIG_SCHEMA}
+
+        unknown_keys = [
+            *(key for key in config if key not in known_keys | {PERFORMANCE_SECTION}),
+            *(
+                f"{PERFORMANCE_SECTION}.{key}"
+                for key in performance
+                if key not in known_keys
+            ),
+        ]
+        if unknown_keys:
+            print(f"Ignoring unknown keys in config.json: {', '.join(unknown_keys)}")
+
+        unknown_overrides = [key for key in cli_overrides if key not in known_keys]
+        if unknown_overrides:
+            print(f"Unknown config keys passed to {CLI_SET_FLAG}: {unknown_overrides}")
+            exit()
 
-    def get_yt_dlp_path(self):
-        if self.config_data[ConfigParams.YT_DLP_PATH.value]:
-            return self.config_data[ConfigParams.YT_DLP_PATH.value]
-        else:
-            return "yt-dlp"
+        for param, setting in CONFIG_SCHEMA.items():
+            candidates = [(setting.default, "default")]
+            # null in config.json leaves the default
+            if config.get(param.value) is not None:
+                candidates.append((config[param.value], "config.json"))
+            if setting.section and performance.get(param.value) is not None:
+                candidates.append((performance[param.value], "config.json"))
+            if get_env_name(param) in os.environ:
+                candidates.append(
+                    (os.environ[get_env_name(param)], get_env_name(param))
+                )
+            if param.value in cli_overrides:
+                candidates.append((cli_overrides[param.value], CLI_SET_FLAG))
 
-    def get_final_video_duration(self) -> int:
-        if self.config_data[ConfigParams.FINAL_VIDEO_DURATION.value]:
+            self.settings[param], self.sources[param] = self.resolve_setting(
+                param, setting, candidates
+            )
+
+    def resolve_setting(
+        self, param: "ConfigParams", setting: "Setting", candidates: list[tuple]
+    ) -> tuple[object, str]:
+        """Value and source of the last candidate the setting accepts.
+
+        A rejected override falls back to the source before it with a
+        warning, an invalid config.json value stops the run like it always
+        did, except for modes which fall back to their default.
+        """
+        while len(candidates) > 1:
+            value, source = candidates.pop()
             try:
-                return int(self.config_data[ConfigParams.FINAL_VIDEO_DURATION.value])
-            except Exception:
-                print("Enter a valid integer in config.json for final-video-duration")
-                exit()
-
-    def get_output_directory(self):
-        output_dir = self.config_data[ConfigParams.OUTPUT_DIRECTORY.value]
-        if output_dir:
-            return output_dir
-        else:
-            return "output"
+                parsed = setting.parse(value)
+            except (TypeError, ValueError):
+                if source == "config.json" and not isinstance(setting.kind, type(Enum)):
+                    print(
+                        f"Enter a valid {setting.describe()} for {param.value} (from {source}), got {value!r}"
+                    )
+                    exit()
 
-    def get_links_file_path(self):
-        links_file = self.config_data[ConfigParams.LINKS_FILE_PATH.value]
-        if links_file:
-            return links_file
-        else:
-            return "links.txt"
+                fallback = candidates[-1][0]
+                self.logger.log_file_with_stdout(
+                    f"Ignoring invalid {param.value} {value!r} from {source}, expected {setting.describe()}, using {fallback.value if isinstance(fallback, Enum) else fallback}",
+                    LoggingLevel.Warn,
+                )
+                continue
 
-    def get_asset_video_path(self):
-        asset_file = self.config_data[ConfigParams.ASSET_VIDEO_PATH.value]
-        if asset_file:
-            return asset_file
-        else:
-            return "sample.mp4"
+            if setting.minimum is not None and parsed < setting.minimum:
+                self.logger.log_file_with_stdout(
+                    f"{param.value} {parsed} from {source} is below the minimum of {setting.minimum}, using {setting.minimum}",
+                    LoggingLevel.Warn,
+                )
+                parsed = setting.kind(setting.minimum)
 
-    def get_youtube_api_key(self):
-        youtube_api_key = self.config_data[ConfigParams.YOUTUBE_API_KEY.value]
-        if youtube_api_key:
-            return youtube_api_key
-        else:
-            return None
+            return parsed, source
 
-    def get_ffprobe_path(self):
-        try:
-            ffmpeg = self.get_ffmpeg_path()
-            splits = ffmpeg.rsplit("/", 1)
-            return splits[len(splits) - 1].replace("ffmpeg", "ffprobe")
-        except:
-            return "ffprobe"
+        return setting.default, "default"
 
-    def check_for_ffmpeg(self, logger: Logger):
-        ffmpeg_path = self.get_ffmpeg_path()
-        search_for = "ffmpeg"
-        try:
-            logger.log_file_with_stdout(
-                f"Searching for {search_for} on your device.", LoggingLevel.Info
+    def log_effective_config(self, logger: Logger):
+        """Writes every setting and where it came from to the log"""
+        overridden: list[str] = []
+
+        for param, setting in CONFIG_SCHEMA.items():
+            value = self.settings[param]
+            if isinstance(value, Enum):
+                value = value.value
+            if setting.secret and value:
+                value = "********"
+
+            source = self.sources[param]
+            logger.log_file_only(
+                f"config {param.value} = {value} ({source})", LoggingLevel.Info
             )
-            logger.log_file_only(f"Searching at {ffmpeg_path}", LoggingLevel.Info)
+            if source not in ("default", "config.json"):
+                overridden.append(f"{param.value}={value} ({source})")
 
-            proc = subprocess.run(
-                [ffmpeg_path, "-version"],
-                capture_output=True,
-                shell=self.is_windows,
-                check=True,
+        if overridden:
+            logger.log_file_with_stdout(
+                f"Config overrides: {', '.join(overridden)}", LoggingLevel.Info
             )
 
-            if proc.stdout:
-                logger.log_file_only(
-                    f"Return Code from {search_for} {proc.returncode}",
-                    LoggingLevel.Info,
-                )
-                logger.log_file_only(proc.stdout, LoggingLevel.Info)
-                logger.log_file_with_stdout(
-                    f"{search_for} is installed", LoggingLevel.Info
-                )
+    def get(self, param: "ConfigParams"):
+        return self.settings[param]
 
-            if proc.stderr:
-                logger.log_file_only(
-                    f"Return Code from {search_for} {proc.returncode}",
-                    LoggingLevel.Info,
-                )
-                logger.log_file_only(proc.stderr, LoggingLevel.Error)
-                exit()
+    def get_ffmpeg_path(self) -> str:
+        return self.get(ConfigParams.FFMPEG_PATH)
 
-        except subprocess.CalledProcessError as process_error:
-            logger.log_file_with_stdout(
-                f"{search_for} returned with status code of {process_error.returncode}",
-                LoggingLevel.Error,
-            )
+    def get_yt_dlp_path(self) -> str:
+        return self.get(ConfigParams.YT_DLP_PATH)
 
-        except FileNotFoundError as e:
-            logger.log_file_with_stdout(
-                f"{search_for} does not exists.{e}", LoggingLevel.Error
-            )
-            exit()
+    def get_final_video_duration(self) -> int:
+        return self.get(ConfigParams.FINAL_VIDEO_DURATION)
 
-        except Exception as e:
-            logger.log_file_with_stdout(
-                f"Unexpected Error Occured. Please submit the log files. {e}",
-                LoggingLevel.Fatal,
-            )
-            exit()
+    def get_output_directory(self) -> str:
+        return self.get(ConfigParams.OUTPUT_DIRECTORY)
 
-    def check_for_yt_dlp(self, logger: Logger):
-        ytdlp_path = self.get_yt_dlp_path()
-        search_for = "yt-dlp"
-        try:
-            logger.log_file_with_stdout(
-                f"Searching for {search_for} on your device.", LoggingLevel.Info
-            )
-            logger.log_file_only(f"Searching at {ytdlp_path}", LoggingLevel.Info)
+    def get_links_file_path(self) -> str:
+        return self.get(ConfigParams.LINKS_FILE_PATH)
 
-            proc = subprocess.run(
-                [ytdlp_path, "--version"],
-                capture_output=True,
-                shell=self.is_windows,
-                check=True,
-            )
+    def get_asset_video_path(self) -> str:
+        return self.get(ConfigParams.ASSET_VIDEO_PATH)
 
-            if proc.stdout:
-                logger.log_file_only(
-                    f"Return Code from {search_for} {proc.returncode}",
-                    LoggingLevel.Info,
-                )
-                logger.log_file_only(proc.stdout, LoggingLevel.Info)
-                logger.log_file_with_stdout(
-                    f"{search_for} is installed", LoggingLevel.Info
-                )
+    def get_youtube_api_key(self) -> None | str:
+        return self.get(ConfigParams.YOUTUBE_API_KEY)
 
-            if proc.stderr:
-                logger.log_file_only(
-                    f"Return Code from {search_for} {proc.returncode}",
-                    LoggingLevel.Info,
+    def get_render_mode(self) -> "RenderMode":
+        return self.get(ConfigParams.RENDER_MODE)
+
+    def get_editor_workers(self) -> int:
+        return self.get(ConfigParams.EDITOR_WORKERS)
+
+    def get_download_workers(self) -> int:
+        return self.get(ConfigParams.DOWNLOAD_WORKERS)
+
+    def get_upload_workers(self) -> int:
+        return self.get(ConfigParams.UPLOAD_WORKERS)
+
+    def get_stage_queue_size(self) -> int:
+        return self.get(ConfigParams.STAGE_QUEUE_SIZE)
+
+    def get_download_fragments(self) -> int:
+        return self.get(ConfigParams.DOWNLOAD_FRAGMENTS)
+
+    def get_download_retries(self) -> int:
+        return self.get(ConfigParams.DOWNLOAD_RETRIES)
+
+    def get_ingress_bandwidth(self) -> int:
+        """Download budget in bytes per second, 0 is unlimited"""
+        return self.get(ConfigParams.INGRESS_BANDWIDTH)
+
+    def get_egress_bandwidth(self) -> int:
+        """Upload budget in bytes per second, 0 is unlimited"""
+        return self.get(ConfigParams.EGRESS_BANDWIDTH)
+
+    def get_upload_retries(self) -> int:
+        return self.get(ConfigParams.UPLOAD_RETRIES)
+
+    def get_upload_retry_max_delay(self) -> int:
+        """Longest wait between two upload retries in seconds"""
+        return self.get(ConfigParams.UPLOAD_RETRY_MAX_DELAY)
+
+    def get_metadata_cache_ttl(self) -> int:
+        return self.get(ConfigParams.METADATA_CACHE_TTL)
+
+    def get_metadata_cache_size(self) -> int:
+        """Most video titles kept in the metadata cache"""
+        return self.get(ConfigParams.METADATA_CACHE_SIZE)
+
+    def get_scratch_directory(self) -> str:
+        """Where downloads, intermediate renders and caches are kept"""
+        return self.get(ConfigParams.SCRATCH_DIRECTORY)
+
+    def get_upload_chunk_size(self) -> int:
+        """Size of the first upload chunk in bytes, later ones adapt"""
+        return self.get(ConfigParams.UPLOAD_CHUNK_SIZE)
+
+    def get_upload_chunk_max_size(self) -> int:
+        return self.get(ConfigParams.UPLOAD_CHUNK_MAX_SIZE)
+
+    def get_audio_encoder(self) -> str:
+        """ffmpeg audio encoder, `auto` picks the best aac encoder available"""
+        return self.get(ConfigParams.AUDIO_ENCODER)
+
+    def get_audio_bitrate(self) -> str:
+        return self.get(ConfigParams.AUDIO_BITRATE)
+
+    def get_encoder_threads(self) -> int:
+        """Threads of each ffmpeg encode, 0 lets ffmpeg decide"""
+        return self.get(ConfigParams.ENCODER_THREADS)
+
+    def get_http_timeout(self) -> tuple[float, float]:
+        """(connect, read) timeout of plain HTTP requests in seconds"""
+        return (
+            self.get(ConfigParams.HTTP_CONNECT_TIMEOUT),
+            self.get(ConfigParams.HTTP_READ_TIMEOUT),
+        )
+
+    def get_thumbnail_timeout(self) -> tuple[float, float]:
+        """(connect, read) timeout of thumbnail downloads, they're small"""
+        return (
+            self.get(ConfigParams.HTTP_CONNECT_TIMEOUT),
+            self.get(ConfigParams.THUMBNAIL_READ_TIMEOUT),
+        )
+
+    def get_api_timeout(self) -> float:
+        """Socket timeout of YouTube API requests, uploads included"""
+        return self.get(ConfigParams.API_TIMEOUT)
+
+    def get_ffmpeg_version(self) -> str:
+        """First line of `ffmpeg -version`, cached with the toolchain"""
+        return self.get_toolchain().version("ffmpeg") or "unknown"
+
+    def get_download_mode(self) -> "DownloadMode":
+        return self.get(ConfigParams.DOWNLOAD_MODE)
+
+    def get_daily_quota(self) -> int:
+        """YouTube Data API units the project may spend per day"""
+        return self.get(ConfigParams.DAILY_QUOTA)
+
+    def get_upload_priority(self) -> "UploadPriority":
+        return self.get(ConfigParams.UPLOAD_PRIORITY)
+
+    def get_publish_mode(self) -> "PublishMode":
+        return self.get(ConfigParams.PUBLISH_MODE)
+
+    def get_stream_tee(self) -> bool:
+        """Whether streamed uploads are also written to the output directory"""
+        return self.get(ConfigParams.STREAM_TEE)
+
+    def get_ffprobe_path(self):
+        """ffprobe next to the configured ffmpeg, from PATH if none is configured"""
+        ffmpeg = self.get_ffmpeg_path()
+        directory, name = os.path.split(ffmpeg)
+        if "ffmpeg" not in name:
+            return "ffprobe"
+        return os.path.join(directory, name.replace("ffmpeg", "ffprobe"))
+
+    def get_toolchain(self) -> Toolchain:
+        """Registry of the external tools, created on first use"""
+        with self.toolchain_lock:
+            if self.toolchain is None:
+                self.toolchain = Toolchain(
+                    logger=self.logger,
+                    paths={
+                        "ffmpeg": self.get_ffmpeg_path(),
+                        "ffprobe": self.get_ffprobe_path(),
+                        "yt-dlp": self.get_yt_dlp_path(),
+                    },
+                    is_windows=self.is_windows,
+                    cache_path=f"{self.get_scratch_directory()}/toolchain_cache.json",
                 )
-                logger.log_file_only(proc.stderr, LoggingLevel.Error)
 
-        except subprocess.CalledProcessError as process_error:
+            return self.toolchain
+
+    def check_for_ffmpeg(self, logger: Logger):
+        self.check_for_tool("ffmpeg", logger)
+
+    def check_for_yt_dlp(self, logger: Logger):
+        self.check_for_tool("yt-dlp", logger)
+
+    def check_for_tool(self, tool: str, logger: Logger):
+        toolchain = self.get_toolchain()
+        logger.log_file_with_stdout(
+            f"Searching for {tool} on your device.", LoggingLevel.Info
+        )
+        logger.log_file_only(f"Searching at {toolchain.paths[tool]}", LoggingLevel.Info)
+
+        path = toolchain.resolve(tool)
+        if path is None:
             logger.log_file_with_stdout(
-                f"{search_for} returned with status code of {process_error.returncode}",
+                f"{tool} does not exists. checked at {toolchain.paths[tool]}",
                 LoggingLevel.Error,
             )
             exit()
 
-        except FileNotFoundError as e:
+        version = toolchain.version(tool)
+        if version is None:
             logger.log_file_with_stdout(
-                f"{search_for} does not exists.{e}", LoggingLevel.Error
+                f"{tool} at {path} failed to report its version", LoggingLevel.Error
             )
             exit()
 
-        except Exception as e:
-            logger.log_file_with_stdout(
-                f"Unexpected Error Occured. Please submit the log files. {e}",
-                LoggingLevel.Fatal,
-            )
-            exit()
+        logger.log_file_only(f"{tool} {path} -> {version}", LoggingLevel.Info)
+        logger.log_file_with_stdout(f"{tool} is installed", LoggingLevel.Info)
 
 
 class ConfigParams(Enum):
@@ -251,3 +395,215 @@ class ConfigParams(Enum):
     ASSET_VIDEO_PATH = "asset-video-path"
     OUTPUT_DIRECTORY = "output-directory"
     LINKS_FILE_PATH = "links-file-path"
+    RENDER_MODE = "render-mode"
+    EDITOR_WORKERS = "editor-workers"
+    DOWNLOAD_WORKERS = "download-workers"
+    UPLOAD_WORKERS = "upload-workers"
+    STAGE_QUEUE_SIZE = "stage-queue-size"
+    METADATA_CACHE_TTL = "metadata-cache-ttl"
+    DOWNLOAD_FRAGMENTS = "download-fragments"
+    DOWNLOAD_MODE = "download-mode"
+    DOWNLOAD_RETRIES = "download-retries"
+    INGRESS_BANDWIDTH = "ingress-bandwidth"
+    EGRESS_BANDWIDTH = "egress-bandwidth"
+    UPLOAD_RETRIES = "upload-retries"
+    UPLOAD_RETRY_MAX_DELAY = "upload-retry-max-delay"
+    DAILY_QUOTA = "daily-quota"
+    UPLOAD_PRIORITY = "upload-priority"
+    PUBLISH_MODE = "publish-mode"
+    STREAM_TEE = "stream-tee"
+    METADATA_CACHE_SIZE = "metadata-cache-size"
+    SCRATCH_DIRECTORY = "scratch-directory"
+    UPLOAD_CHUNK_SIZE = "upload-chunk-size"
+    UPLOAD_CHUNK_MAX_SIZE = "upload-chunk-max-size"
+    AUDIO_ENCODER = "audio-encoder"
+    AUDIO_BITRATE = "audio-bitrate"
+    ENCODER_THREADS = "encoder-threads"
+    HTTP_CONNECT_TIMEOUT = "http-connect-timeout"
+    HTTP_READ_TIMEOUT = "http-read-timeout"
+    THUMBNAIL_READ_TIMEOUT = "thumbnail-read-timeout"
+    API_TIMEOUT = "api-timeout"
+
+
+class RenderMode(Enum):
+    MULTI_PASS = "multi-pass"
+    SINGLE_PASS = "single-pass"
+
+
+class DownloadMode(Enum):
+    VIDEO = "video"
+    AUDIO = "audio"
+
+
+class PublishMode(Enum):
+    FILE = "file"
+    STREAM = "stream"
+
+
+class UploadPriority(Enum):
+    SMALLEST = "smallest"
+    LARGEST = "largest"
+    OLDEST = "oldest"
+    NEWEST = "newest"
+
+
+class Setting:
+    """Type, default and lower bound of a config key.
+
+    Only a missing key or null means the default, 0 is a value of its own
+    (no retries, unlimited bandwidth, ffmpeg picks the threads). Numbers
+    below `minimum` are raised to it with a warning. Values from the
+    environment and the command line are strings and get converted.
+    """
+
+    def __init__(
+        self,
+        kind: type,
+        default,
+        minimum: None | float = None,
+        section: None | str = None,
+        secret: bool = False,
+    ):
+        self.kind = kind
+        self.default = default
+        self.minimum = minimum
+        self.section = section
+        self.secret = secret
+
+    def parse(self, value):
+        if value is None or value == "":
+            raise ValueError(value)
+
+        if self.kind is bool:
+            if isinstance(value, bool):
+                return value
+            if str(value).lower() in ("true", "1", "yes", "on"):
+                return True
+            if str(value).lower() in ("false", "0", "no", "off"):
+                return False
+            raise ValueError(value)
+
+        if self.kind in (int, float):
+            if isinstance(value, bool):
+                raise TypeError(value)
+            return self.kind(value)
+
+        return self.kind(value)
+
+    def describe(self) -> str:
+        if isinstance(self.kind, type(Enum)):
+            return " / ".join(member.value for member in self.kind)
+        return self.kind.__name__
+
+
+def get_env_name(param: ConfigParams) -> str:
+    return ENV_PREFIX + param.value.upper().replace("-", "_")
+
+
+def parse_cli_overrides() -> dict[str, str]:
+    """Takes every `--set key=value` out of sys.argv.
+
+    The commands are matched on sys.argv[1], so the overrides are removed
+    and can be passed before or after the command.
+    """
+    overrides: dict[str, str] = {}
+    remaining = sys.argv[:1]
+    args = iter(sys.argv[1:])
+
+    for arg in args:
+        if arg == CLI_SET_FLAG:
+            assignment = next(args, "")
+        elif arg.startswith(f"{CLI_SET_FLAG}="):
+            assignment = arg[len(CLI_SET_FLAG) + 1 :]
+        else:
+            remaining.append(arg)
+            continue
+
+        key, separator, value = assignment.partition("=")
+        if not separator:
+            print(f"Expected {CLI_SET_FLAG} key=value, got '{assignment}'")
+            exit()
+        overrides[key.strip()] = value.strip()
+
+    sys.argv[:] = remaining
+    return overrides
+
+
+MiB = 1024 * 1024
+
+CONFIG_SCHEMA: dict[ConfigParams, Setting] = {
+    ConfigParams.FFMPEG_PATH: Setting(str, "ffmpeg"),
+    ConfigParams.YT_DLP_PATH: Setting(str, "yt-dlp"),
+    ConfigParams.FINAL_VIDEO_DURATION: Setting(int, 3600, minimum=1),
+    ConfigParams.YOUTUBE_API_KEY: Setting(str, None, secret=True),
+    ConfigParams.ASSET_VIDEO_PATH: Setting(str, "sample.mp4"),
+    ConfigParams.OUTPUT_DIRECTORY: Setting(str, "output"),
+    ConfigParams.LINKS_FILE_PATH: Setting(str, "links.txt"),
+    ConfigParams.RENDER_MODE: Setting(RenderMode, RenderMode.MULTI_PASS),
+    ConfigParams.DOWNLOAD_MODE: Setting(DownloadMode, DownloadMode.VIDEO),
+    ConfigParams.PUBLISH_MODE: Setting(PublishMode, PublishMode.FILE),
+    ConfigParams.STREAM_TEE: Setting(bool, False),
+    ConfigParams.UPLOAD_PRIORITY: Setting(UploadPriority, UploadPriority.SMALLEST),
+    ConfigParams.DAILY_QUOTA: Setting(int, 10000, minimum=1),
+    # performance
+    ConfigParams.EDITOR_WORKERS: Setting(
+        int, os.cpu_count() or 1, minimum=1, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.DOWNLOAD_WORKERS: Setting(
+        int, 2, minimum=1, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.UPLOAD_WORKERS: Setting(
+        int, 1, minimum=1, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.STAGE_QUEUE_SIZE: Setting(
+        int, 2, minimum=1, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.SCRATCH_DIRECTORY: Setting(str, "files", section=PERFORMANCE_SECTION),
+    ConfigParams.DOWNLOAD_FRAGMENTS: Setting(
+        int, 4, minimum=1, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.DOWNLOAD_RETRIES: Setting(
+        int, 3, minimum=0, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.INGRESS_BANDWIDTH: Setting(
+        int, 0, minimum=0, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.EGRESS_BANDWIDTH: Setting(
+        int, 0, minimum=0, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.UPLOAD_CHUNK_SIZE: Setting(
+        int, 5 * MiB, minimum=1, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.UPLOAD_CHUNK_MAX_SIZE: Setting(
+        int, 128 * MiB, minimum=1, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.UPLOAD_RETRIES: Setting(
+        int, 10, minimum=0, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.UPLOAD_RETRY_MAX_DELAY: Setting(
+        int, 64, minimum=1, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.AUDIO_ENCODER: Setting(str, "auto", section=PERFORMANCE_SECTION),
+    ConfigParams.AUDIO_BITRATE: Setting(str, "192k", section=PERFORMANCE_SECTION),
+    ConfigParams.ENCODER_THREADS: Setting(
+        int, 0, minimum=0, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.HTTP_CONNECT_TIMEOUT: Setting(
+        float, 5.0, minimum=0.1, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.HTTP_READ_TIMEOUT: Setting(
+        float, 30.0, minimum=0.1, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.THUMBNAIL_READ_TIMEOUT: Setting(
+        float, 15.0, minimum=0.1, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.API_TIMEOUT: Setting(
+        float, 120.0, minimum=1, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.METADATA_CACHE_TTL: Setting(
+        int, 7 * 24 * 3600, minimum=1, section=PERFORMANCE_SECTION
+    ),
+    ConfigParams.METADATA_CACHE_SIZE: Setting(
+        int, 10000, minimum=1, section=PERFORMANCE_SECTION
+    ),
+}
@@ -5,10 +5,8 @@ from .randomizer import RandomizerUsageMode
 help_flag = '--help'
 
 def is_help_arg_passed() -> bool: 
-    if len(sys.argv) < 2:
-        return False
-
-    return sys.argv[1] == help_flag
+    # --set overrides may come before the command
+    return help_flag in sys.argv[1:]
 
 def print_help():
     print("\t\tMozart-tube(Help manual)\n")
@@ -19,4 +17,8 @@ def print_help():
     print(f'\t\t\t{RandomizerUsageMode.RANDOMLY_SELECT_FEW.name}:{RandomizerUsageMode.RANDOMLY_SELECT_FEW.value}=upload few videos')    
     print('\n')
     print('\t--reset: complete reset, removes asset, auth files\n')
-    print('\t--clean: clean output files & assets files')
+    print('\t--clean: clean output files & assets files\n')
+    print('\t--force-upload: upload videos again even if the upload ledger has them published')
+    print('\t--set key=value: override a config.json key for this run, Ex:--set upload-workers=4')
+    print('\t\tevery key can also be set from the environment as MOZART_<KEY>, Ex:MOZART_UPLOAD_WORKERS=4')
+    print('\t\tperformance keys can be grouped under "performance" in config.json')
@@ -0,0 +1,85 @@
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.config import ConfigLoader
+
+# (connect, read) timeouts in seconds, used when no config is passed
+DEFAULT_TIMEOUT = (5, 30)
+HOST_TIMEOUTS = {
+    "www.googleapis.com": (5, 30),
+    "i.ytimg.com": (5, 15),
+}
+
+
+class HttpClient:
+    """Keep-alive session shared by everything that talks plain HTTP.
+
+    Connections are pooled per host with room for every worker, idempotent
+    requests are retried with exponential backoff on connection errors and
+    5xx/429 responses, and every request gets the (connect, read) timeout of
+    its host so a stalled server can't hang a worker forever.
+    """
+
+    def __init__(
+        self,
+        pool_size: int,
+        timeout: tuple[float, float] = DEFAULT_TIMEOUT,
+        host_timeouts: dict[str, tuple[float, float]] = HOST_TIMEOUTS,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+    ):
+        self.timeout = timeout
+        self.host_timeouts = host_timeouts
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=len(self.host_timeouts) + 1,
+            pool_maxsize=pool_size,
+            max_retries=retry,
+        )
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault(
+            "timeout", self.host_timeouts.get(urlparse(url).hostname, self.timeout)
+        )
+        return self.session.get(url, **kwargs)
+
+
+_client: None | HttpClient = None
+_client_lock = threading.Lock()
+
+
+def get_http_client(config_loader: ConfigLoader) -> HttpClient:
+    """Returns the process wide client, sized for the configured workers"""
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            pool_size = max(
+                config_loader.get_download_workers(),
+                config_loader.get_editor_workers(),
+                config_loader.get_upload_workers(),
+            )
+            _client = HttpClient(
+                pool_size=pool_size,
+                timeout=config_loader.get_http_timeout(),
+                host_timeouts={
+                    "www.googleapis.com": config_loader.get_http_timeout(),
+                    "i.ytimg.com": config_loader.get_thumbnail_timeout(),
+                },
+            )
+
+        return _client
@@ -87,3 +87,20 @@ class Logger:
             self.dual_logger.warning(message)
         else:
             self.dual_logger.info(message)
+
+
+class JobLogger(Logger):
+    """Logger for a single job, shares the handlers of the parent logger and
+    prefixes every message with the job id so concurrent jobs stay readable"""
+
+    def __init__(self, logger: Logger, job_id: str):
+        self.log_filename = logger.log_filename
+        self.dual_logger = logger.dual_logger
+        self.file_only_logger = logger.file_only_logger
+        self.job_id = job_id
+
+    def log_file_only(self, message: str, level: LoggingLevel):
+        super().log_file_only(f"[{self.job_id}] {message}", level)
+
+    def log_file_with_stdout(self, message: str, level: LoggingLevel):
+        super().log_file_with_stdout(f"[{self.job_id}] {message}", level)
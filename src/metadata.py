@@ -0,0 +1,168 @@
+from collections.abc import Iterable
+import threading
+import time
+
+import requests
+
+from src.config import ConfigLoader
+from src.http_client import get_http_client
+from src.logger import Logger, LoggingLevel
+from src.uploader.quota import get_quota_tracker
+import src.utils as utils
+
+
+class VideoMetadataService:
+    """Resolves video titles through the YouTube Data API.
+
+    Ids are looked up in batches of up to 50 (the limit of `videos.list`)
+    asking only for the snippet title, and every result is kept in an on
+    disk cache for `metadata-cache-ttl` seconds so reruns don't spend quota
+    on videos they already know. The cache holds at most
+    `metadata-cache-size` titles.
+    """
+
+    api_url = "https://www.googleapis.com/youtube/v3/videos"
+    batch_size = 50
+
+    def __init__(
+        self,
+        logger: Logger,
+        config_loader: ConfigLoader,
+        cache_path: None | str = None,
+    ):
+        self.logger = logger
+        self.config_loader = config_loader
+        self.cache_path = (
+            cache_path or f"{config_loader.get_scratch_directory()}/metadata_cache.json"
+        )
+        self.ttl = config_loader.get_metadata_cache_ttl()
+        self.max_entries = config_loader.get_metadata_cache_size()
+        self.http_client = get_http_client(config_loader)
+        self.quota_tracker = get_quota_tracker(config_loader, logger)
+        self.lock = threading.Lock()
+        self.cache: dict[str, dict] = {}
+
+        try:
+            self.cache = utils.load_json(self.cache_path, self.cache)
+        except Exception as e:
+            self.logger.log_file_only(
+                f"Ignoring unreadable metadata cache {self.cache_path} {e}",
+                LoggingLevel.Warn,
+            )
+
+    def get_title(self, video_id: str) -> None | str:
+        entry = self._get_cached(video_id)
+        if entry is None:
+            self.prefetch([video_id])
+            entry = self._get_cached(video_id)
+
+        return entry["title"] if entry else None
+
+    def prefetch(self, video_ids: Iterable[str]):
+        missing = [
+            video_id
+            for video_id in dict.fromkeys(video_ids)
+            if video_id and self._get_cached(video_id) is None
+        ]
+        if not missing:
+            return
+
+        self.logger.log_file_only(
+            f"Fetching metadata of {len(missing)} videos", LoggingLevel.Info
+        )
+
+        for start in range(0, len(missing), self.batch_size):
+            self._fetch_batch(missing[start : start + self.batch_size])
+
+        with self.lock:
+            self._save()
+
+    def _fetch_batch(self, video_ids: list[str]):
+        params = {
+            "id": ",".join(video_ids),
+            "part": "snippet",
+            "fields": "items(id,snippet(title))",
+            "key": self.config_loader.get_youtube_api_key(),
+        }
+
+        try:
+            response = self.http_client.get(self.api_url, params=params)
+            self.quota_tracker.record("videos.list")
+
+            if not response.ok:
+                self.logger.log_file_with_stdout(
+                    f"Failed to request youtube. Status code :{response.status_code}",
+                    LoggingLevel.Error,
+                )
+                return
+
+            fetched_at = time.time()
+            with self.lock:
+                for item in response.json().get("items", []):
+                    self.cache[item["id"]] = {
+                        "title": item["snippet"]["title"],
+                        "fetched_at": fetched_at,
+                    }
+                    self.logger.log_file_only(
+                        f"Extracted Title {item['snippet']['title']}",
+                        LoggingLevel.Info,
+                    )
+
+        except requests.ConnectionError as conn_error:
+            self.logger.log_file_with_stdout(
+                f"Please check your internet connection !!", LoggingLevel.Error
+            )
+            self.logger.log_file_only(
+                f"Connection error {conn_error}", LoggingLevel.Error
+            )
+
+        except Exception as e:
+            self.logger.log_file_with_stdout(
+                "Unexpected error while fetching video metadata.", LoggingLevel.Error
+            )
+            self.logger.log_file_only(f"Metadata Error {e}", LoggingLevel.Error)
+
+    def _get_cached(self, video_id: str) -> None | dict:
+        with self.lock:
+            entry = self.cache.get(video_id)
+        if entry and time.time() - entry["fetched_at"] < self.ttl:
+            return entry
+        return None
+
+    def _save(self):
+        # expired titles are dropped and only the newest max_entries are kept
+        now = time.time()
+        fresh = sorted(
+            (
+                (video_id, entry)
+                for video_id, entry in self.cache.items()
+                if now - entry["fetched_at"] < self.ttl
+            ),
+            key=lambda item: item[1]["fetched_at"],
+        )
+        self.cache = dict(fresh[-self.max_entries :])
+
+        try:
+            utils.save_json(self.cache_path, self.cache, indent=None)
+        except Exception as e:
+            self.logger.log_file_only(
+                f"Failed to save metadata cache {e}", LoggingLevel.Error
+            )
+
+
+_service: None | VideoMetadataService = None
+_service_lock = threading.Lock()
+
+
+def get_metadata_service(
+    logger: Logger, config_loader: ConfigLoader
+) -> VideoMetadataService:
+    """Returns the process wide service, so every stage reads the titles
+    prefetched by the others and only one copy of the cache is saved"""
+    global _service
+
+    with _service_lock:
+        if _service is None:
+            _service = VideoMetadataService(logger=logger, config_loader=config_loader)
+
+        return _service
@@ -0,0 +1,199 @@
+from collections.abc import Callable, Iterable
+import itertools
+import queue
+import threading
+
+from src.config import ConfigLoader
+from src.logger import JobLogger, Logger, LoggingLevel
+from src.processors.downloader import VideoDownloader
+from src.processors.editor_pool import edit_video
+from src.metadata import VideoMetadataService, get_metadata_service
+from src.uploader.uploader import Uploader
+import src.utils as utils
+
+# put once per worker to tell it the previous stage is done
+_STOP = object()
+
+
+class UploadQueue(queue.PriorityQueue):
+    """Stage queue handing out jobs in the configured upload priority.
+
+    Jobs are ordered by `sort_key` (ties in the order they were put) and
+    the stop markers come after every job, so a worker never quits while
+    something is still waiting for its upload.
+    """
+
+    def __init__(self, sort_key: Callable[[str], float], maxsize: int = 0):
+        super().__init__(maxsize=maxsize)
+        self.sort_key = sort_key
+        self.counter = itertools.count()
+
+    def _put(self, item):
+        key = (1, 0) if item is _STOP else (0, self.sort_key(item))
+        super()._put((key, next(self.counter), item))
+
+    def _get(self):
+        return super()._get()[-1]
+
+
+class Pipeline:
+    """Runs download -> edit -> upload as overlapping stages.
+
+    Every stage has its own worker threads and reads from a bounded queue
+    filled by the previous stage, so video N can upload while N+1 renders
+    and N+2 downloads. A full queue blocks the stage feeding it, which keeps
+    fast stages from running ahead and filling the disk.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        config_loader: ConfigLoader,
+        video_downloader: VideoDownloader,
+        uploader: Uploader,
+    ):
+        self.logger = logger
+        self.config_loader = config_loader
+        self.video_downloader = video_downloader
+        self.uploader = uploader
+        self.metadata_service = get_metadata_service(logger, config_loader)
+
+        queue_size = config_loader.get_stage_queue_size()
+        self.download_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.edit_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.upload_queue: queue.Queue = UploadQueue(
+            uploader.get_upload_sort_key, maxsize=queue_size
+        )
+
+    def run(self, links: Iterable[str]):
+        download_workers = self.config_loader.get_download_workers()
+        editor_workers = self.config_loader.get_editor_workers()
+        upload_workers = self.config_loader.get_upload_workers()
+
+        self.logger.log_file_with_stdout(
+            f"Starting pipeline with {download_workers} download, {editor_workers} editor "
+            f"and {upload_workers} upload workers",
+            LoggingLevel.Info,
+        )
+
+        download_threads = self._start_stage(
+            "download",
+            download_workers,
+            self.download,
+            self.download_queue,
+            self.edit_queue,
+        )
+        edit_threads = self._start_stage(
+            "editor", editor_workers, self.edit, self.edit_queue, self.upload_queue
+        )
+        upload_threads = self._start_stage(
+            "upload", upload_workers, self.upload, self.upload_queue, None
+        )
+
+        # the same link twice would have two jobs writing into one directory
+        queued_links: set[str] = set()
+        batch: list[str] = []
+
+        # deferred by an earlier run for lack of quota, whether or not their
+        # link is still in the links file
+        deferred = self.uploader.deferred.pending()
+        for video_id in sorted(deferred, key=self.uploader.get_upload_sort_key):
+            queued_links.add(f"https://youtu.be/{video_id}")
+            self.upload_queue.put(video_id)
+        for link in links:
+            if link in queued_links:
+                continue
+            queued_links.add(link)
+            batch.append(link)
+
+            if len(batch) == VideoMetadataService.batch_size:
+                self._queue_downloads(batch)
+                batch = []
+
+        self._queue_downloads(batch)
+
+        self._stop_stage(self.download_queue, download_threads)
+        self._stop_stage(self.edit_queue, edit_threads)
+        self._stop_stage(self.upload_queue, upload_threads)
+
+        self.uploader.report_deferred()
+        self.logger.log_file_with_stdout("Pipeline finished", LoggingLevel.Info)
+
+    def _queue_downloads(self, links: list[str]):
+        # titles are resolved in batches before the jobs need them
+        self.metadata_service.prefetch(utils.extract_video_id(link) for link in links)
+        rendered: list[str] = []
+        for link in links:
+            video_id = utils.extract_video_id(link)
+            if self.video_downloader.is_job_rendered(video_id):
+                # rendered by an earlier run that never got it uploaded
+                JobLogger(self.logger, video_id).log_file_with_stdout(
+                    "Already rendered, queueing it for upload", LoggingLevel.Info
+                )
+                rendered.append(video_id)
+            else:
+                self.download_queue.put(link)
+
+        for video_id in sorted(rendered, key=self.uploader.get_upload_sort_key):
+            self.upload_queue.put(video_id)
+
+    def download(self, link: str) -> None | str:
+        try:
+            self.video_downloader.download_video_using_pkg(link)
+            # fetched here so the editor never waits on the network for it
+            self.video_downloader.download_thumbnail(link)
+            return link
+        except Exception as e:
+            self.logger.log_file_with_stdout(
+                f"Failed to download the video {link}", LoggingLevel.Error
+            )
+            self.logger.log_file_only(f"Download Error {e}", LoggingLevel.Error)
+            return None
+
+    def edit(self, link: str) -> None | str:
+        if not edit_video(link, self.logger, self.config_loader, self.metadata_service):
+            return None
+        return utils.extract_video_id(link)
+
+    def upload(self, video_id: str) -> None:
+        try:
+            self.uploader.upload_video_folder(video_id)
+        except Exception as e:
+            job_logger = JobLogger(self.logger, video_id)
+            job_logger.log_file_with_stdout(
+                "Failed to upload the video", LoggingLevel.Error
+            )
+            job_logger.log_file_only(f"Upload Error {e}", LoggingLevel.Error)
+
+    def _start_stage(
+        self,
+        name: str,
+        workers: int,
+        handler: Callable[[str], None | str],
+        input_queue: queue.Queue,
+        output_queue: None | queue.Queue,
+    ) -> list[threading.Thread]:
+        def work():
+            while True:
+                item = input_queue.get()
+                if item is _STOP:
+                    return
+
+                result = handler(item)
+                if result is not None and output_queue is not None:
+                    output_queue.put(result)
+
+        threads = [
+            threading.Thread(target=work, name=f"{name}-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        return threads
+
+    def _stop_stage(self, input_queue: queue.Queue, threads: list[threading.Thread]):
+        for _ in threads:
+            input_queue.put(_STOP)
+        for thread in threads:
+            thread.join()
@@ -1,10 +1,30 @@
-from src.logger import Logger, LoggingLevel
-from src.config import ConfigLoader
+from src.logger import JobLogger, Logger, LoggingLevel
+from src.config import ConfigLoader, DownloadMode, PublishMode
 import re
 import os
 import subprocess
+import threading
+import glob
+import random
+import time
 import src.utils as utils
-import yt_dlp
+from src.bandwidth import get_bandwidth_governor
+from src.http_client import get_http_client
+from src.processors.thumbnail import download_thumbnail
+from src.processors.manifest import StageManifest
+from src.uploader.ledger import get_upload_ledger
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+# yt_dlp takes a good part of a second to import, it's only imported by the
+# methods downloading so a run with nothing left to download never loads it
+if TYPE_CHECKING:
+    import yt_dlp
+
+# playlists and channels, expanded into their videos
+COLLECTION_URL_REGEX = re.compile(
+    r"youtube\.com\/(?:playlist\?|@|channel\/|c\/|user\/)"
+)
 
 
 class VideoDownloader:
@@ -12,8 +32,14 @@ class VideoDownloader:
         self.links_file_path = configLoader.get_links_file_path()
         self.logger = logger
         self.config_loader = configLoader
-        self.temp_directory = "files"
+        self.temp_directory = configLoader.get_scratch_directory()
         self.is_windows = utils.is_windows()
+        self.thread_state = threading.local()
+        self.progress_lock = threading.Lock()
+        self.last_progress_report: dict[str, float] = {}
+        self.downloaded_bytes: dict[str, int] = {}
+        self.bandwidth_governor = get_bandwidth_governor(configLoader, logger)
+        self.ledger = get_upload_ledger(logger)
 
         try:
             output_dir = self.config_loader.get_output_directory()
@@ -59,18 +85,149 @@ class VideoDownloader:
         )
         return match.group(1) if match else None
 
-    def get_links_from_file(self):
-        links: list[str] = []
+    def download_thumbnail(self, link: str) -> bool:
+        video_id = self.get_video_id(link)
+        save_path = f"{self.temp_directory}/{video_id}/thumbnail.jpg"
+
+        if os.path.exists(save_path):
+            return True
+
+        return download_thumbnail(
+            video_id,
+            save_path,
+            get_http_client(self.config_loader),
+            self.logger,
+        )
+
+    def get_links_from_file(self) -> Iterator[str]:
+        """Lines of the links file, read lazily and stripped"""
         self.logger.log_file_only(
             f"Parsing data from file {self.links_file_path}", LoggingLevel.Info
         )
         with open(self.links_file_path, "r") as file:
-            links = file.read().split("\n")
-        self.logger.log_file_only(f"Parsed Data : {links}", LoggingLevel.Info)
-        return links
+            for line in file:
+                line = line.strip()
+                if line:
+                    yield line
+
+    def get_video_links(self) -> Iterator[str]:
+        """Canonical link of every video to process, each one only once.
+
+        Entries are normalized to https://youtu.be/<id> so the same video
+        written as watch?v=, shorts/ or youtu.be is recognized, playlists and
+        channels are expanded into their videos, and videos the upload
+        ledger has as published are left out.
+        """
+        seen: set[str] = set()
+        parsed = duplicates = finished = 0
+
+        for entry in self.get_links_from_file():
+            parsed += 1
+
+            if COLLECTION_URL_REGEX.search(entry):
+                video_ids = self.expand_collection(entry)
+            else:
+                video_id = utils.extract_video_id(entry)
+                if video_id is None:
+                    self.logger.log_file_with_stdout(
+                        f"Not a valid url [ {entry} ]. Skipping...", LoggingLevel.Info
+                    )
+                    continue
+                video_ids = [video_id]
+
+            for video_id in video_ids:
+                if video_id in seen:
+                    duplicates += 1
+                    continue
+                seen.add(video_id)
+
+                if self.is_job_finished(video_id):
+                    finished += 1
+                    continue
+
+                yield f"https://youtu.be/{video_id}"
+
+        self.logger.log_file_with_stdout(
+            f"Read {parsed} entries, {len(seen)} unique videos, skipped "
+            f"{duplicates} duplicates and {finished} already published",
+            LoggingLevel.Info,
+        )
+
+    def expand_collection(self, url: str) -> list[str]:
+        """Video ids of a playlist or channel, without resolving each video"""
+        import yt_dlp
+
+        options = {"extract_flat": "in_playlist", "quiet": True}
+        video_ids: list[str] = []
+
+        try:
+            with yt_dlp.YoutubeDL(options) as youtube_dl:
+                pending = [url]
+                # channels resolve into tabs (videos, shorts...), every tab
+                # is a playlist of its own
+                for _ in range(3):
+                    tabs: list[str] = []
+                    for collection_url in pending:
+                        info = youtube_dl.extract_info(collection_url, download=False)
+                        for entry in info.get("entries") or []:
+                            if entry.get("ie_key") == "Youtube" and entry.get("id"):
+                                video_ids.append(entry["id"])
+                            elif entry.get("url"):
+                                tabs.append(entry["url"])
+                    if not tabs:
+                        break
+                    pending = tabs
+
+        except yt_dlp.utils.DownloadError as e:
+            self.logger.log_file_with_stdout(
+                f"Failed to expand [ {url} ]. Skipping...", LoggingLevel.Error
+            )
+            self.logger.log_file_only(f"Expand Error {e}", LoggingLevel.Error)
+
+        self.logger.log_file_with_stdout(
+            f"Expanded {url} into {len(video_ids)} videos", LoggingLevel.Info
+        )
+        return video_ids
+
+    def is_job_finished(self, video_id: str) -> bool:
+        """True once the video is published, according to the upload ledger"""
+        published = self.ledger.get_by_source(video_id)
+        if published is None:
+            # entries recorded before uploads kept their job id
+            video_path = self.get_rendered_video(video_id)
+            published = self.ledger.get(video_path) if video_path else None
+
+        if published:
+            self.logger.log_file_only(
+                f"{video_id} is already published as {published['video_id']}. "
+                "Skipping...",
+                LoggingLevel.Info,
+            )
+            return True
+        return False
+
+    def get_rendered_video(self, video_id: str) -> None | str:
+        # outputs are written under a temporary name and renamed once
+        # complete, so any mp4 in the job's output directory is finished
+        output_dir = f"{self.config_loader.get_output_directory()}/{video_id}"
+        rendered = glob.glob(f"{output_dir}/*.mp4")
+        return rendered[0] if rendered else None
+
+    def is_job_rendered(self, video_id: str) -> bool:
+        """True when the job only has to be uploaded"""
+        if self.get_rendered_video(video_id):
+            return True
+
+        # streamed jobs are rendered while uploading, editing leaves the
+        # merged video and the output directory behind
+        return (
+            self.config_loader.get_publish_mode() == PublishMode.STREAM
+            and os.path.isdir(f"{self.config_loader.get_output_directory()}/{video_id}")
+            and os.path.exists(f"{self.temp_directory}/{video_id}/final_output.mp4")
+        )
 
     def download_video(self, link: str):
-        yt_dlp_path = self.config_loader.get_yt_dlp_path()
+        yt_dlp_path = self.config_loader.get_toolchain().path("yt-dlp")
         video_id = self.get_video_id(link)
 
         if os.path.exists(
@@ -140,20 +297,271 @@ class VideoDownloader:
             self.logger.log_file_only(f"Error {e}.", LoggingLevel.Fatal)
 
     def download_video_using_pkg(self, link: str):
+        import yt_dlp
+
         video_id = self.get_video_id(link)
+        saved_dir = f"{self.temp_directory}/{video_id}"
+        manifest = StageManifest(
+            job_directory=saved_dir,
+            tool_version=f"yt-dlp {yt_dlp.version.__version__}",
+            logger=self.logger,
+        )
 
-        save_path = f"{self.temp_directory}/{video_id}/input.webm"
+        if self.config_loader.get_download_mode() == DownloadMode.AUDIO:
+            self.download_audio_using_pkg(video_id, manifest)
+            return
 
-        if os.path.exists(save_path):
+        save_path = f"{saved_dir}/input.webm"
+
+        if self.is_download_complete(save_path, manifest):
             self.logger.log_file_with_stdout(
                 f"downloaded video is already present. Skipping Downloading...",
                 LoggingLevel.Info,
             )
             return
 
-        yt_opts = {
-            "outtmpl": save_path,
-        }
+        info, downloaded_path = self.download_with_retries(video_id)
+        os.replace(downloaded_path, manifest.temp_path(save_path))
+        manifest.commit(
+            save_path,
+            manifest.describe(inputs=[], params={"format": info.get("format_id")}),
+        )
+
+    def download_audio_using_pkg(self, video_id: str, manifest: StageManifest):
+        """Downloads only the best audio format of the video.
+
+        m4a (aac) is preferred as it can be muxed without transcoding, it's
+        stored straight away as the job's audio.m4a so the editor skips
+        converting and extracting. Any other format is kept as
+        audio_source.<ext> for the editor to extract from.
+        """
+        saved_dir = f"{self.temp_directory}/{video_id}"
+        audio_path = f"{saved_dir}/audio.m4a"
+        audio_sources = [
+            source
+            for source in glob.glob(f"{saved_dir}/audio_source.*")
+            if self.is_download_complete(source, manifest)
+        ]
+
+        if manifest.is_complete(audio_path) or audio_sources:
+            self.logger.log_file_with_stdout(
+                f"downloaded audio is already present. Skipping Downloading...",
+                LoggingLevel.Info,
+            )
+            return
+
+        info, downloaded_path = self.download_with_retries(video_id)
+
+        if info.get("ext") == "m4a":
+            save_path = audio_path
+        else:
+            save_path = f"{saved_dir}/audio_source.{info.get('ext')}"
+
+        os.replace(downloaded_path, manifest.temp_path(save_path))
+        manifest.commit(
+            save_path,
+            manifest.describe(inputs=[], params={"format": info.get("format_id")}),
+        )
+        self.logger.log_file_with_stdout(
+            f"Stored downloaded audio as {save_path}", LoggingLevel.Info
+        )
+
+    def is_download_complete(self, save_path: str, manifest: StageManifest) -> bool:
+        if manifest.is_complete(save_path):
+            return True
+
+        if not os.path.exists(save_path):
+            return False
+
+        # downloaded before downloads were recorded in the manifest, it's
+        # only trusted after the same checks a fresh download goes through
+        if self.is_valid_media(save_path):
+            manifest.commit(save_path, manifest.describe(inputs=[], params={}))
+            return True
+
+        self.logger.log_file_with_stdout(
+            f"{save_path} is incomplete, downloading it again", LoggingLevel.Warn
+        )
+        os.remove(save_path)
+        return False
+
+    def download_with_retries(self, video_id: str) -> tuple[dict, str]:
+        """Downloads into a temporary file and returns its info and path.
+
+        yt-dlp resumes from the `.part` file an interrupted run left behind.
+        A finished download is only returned once it passed is_valid_media,
+        failed attempts are retried with exponential backoff and full jitter.
+        """
+        import yt_dlp
 
-        with yt_dlp.YoutubeDL(yt_opts) as downloader:
-            downloader.download([video_id])
+        retries = self.config_loader.get_download_retries()
+        last_error = None
+
+        for attempt in range(retries + 1):
+            try:
+                youtube_dl = self.get_youtube_dl()
+                self.thread_state.transferred_bytes = None
+                info = youtube_dl.extract_info(video_id, download=True)
+                downloaded_path = info["requested_downloads"][0]["filepath"]
+
+                # postprocessors like the m4a fixup remux the file after it's
+                # downloaded, so the remote size is compared with the bytes
+                # yt-dlp transferred rather than with the final file
+                transferred = self.thread_state.transferred_bytes
+                expected_size = info.get("filesize")
+                if expected_size and transferred and transferred != expected_size:
+                    last_error = (
+                        f"{downloaded_path} got {transferred} of {expected_size} bytes"
+                    )
+                    os.remove(downloaded_path)
+                elif self.is_valid_media(downloaded_path):
+                    return info, downloaded_path
+                else:
+                    last_error = f"{downloaded_path} failed verification"
+                    os.remove(downloaded_path)
+
+            except yt_dlp.utils.DownloadError as e:
+                last_error = e
+
+            if attempt == retries:
+                break
+
+            delay = random.uniform(0, min(60, 2 * 2**attempt))
+            self.logger.log_file_with_stdout(
+                f"Download of {video_id} failed, retrying in {delay:.1f} sec "
+                f"({attempt + 1}/{retries})",
+                LoggingLevel.Warn,
+            )
+            self.logger.log_file_only(f"Download Error {last_error}", LoggingLevel.Warn)
+            time.sleep(delay)
+
+        raise Exception(
+            f"Download of {video_id} failed after {retries + 1} attempts: {last_error}"
+        )
+
+    def is_valid_media(self, path: str, expected_size: None | int = None) -> bool:
+        """Checks the size of the file and that ffprobe can read a duration"""
+        try:
+            size = os.path.getsize(path)
+            if size == 0 or (expected_size and size != expected_size):
+                self.logger.log_file_only(
+                    f"{path} has {size} bytes, expected {expected_size}",
+                    LoggingLevel.Error,
+                )
+                return False
+
+            process = subprocess.run(
+                [
+                    self.config_loader.get_toolchain().path("ffprobe"),
+                    "-v",
+                    "error",
+                    "-show_entries",
+                    "format=duration",
+                    "-of",
+                    "csv=p=0",
+                    path,
+                ],
+                capture_output=True,
+                shell=self.is_windows,
+                check=True,
+            )
+            return float(process.stdout.strip()) > 0
+
+        except Exception as e:
+            self.logger.log_file_only(
+                f"Verification of {path} failed {e}", LoggingLevel.Error
+            )
+            return False
+
+    def get_youtube_dl(self) -> "yt_dlp.YoutubeDL":
+        """YoutubeDL instance of the calling worker thread.
+
+        Creating one per link throws away the extractor state (player js,
+        signatures, cookies), so every worker keeps its own configured
+        instance for the whole batch. YoutubeDL isn't thread safe, that's why
+        it isn't shared between workers.
+        """
+        youtube_dl = getattr(self.thread_state, "youtube_dl", None)
+
+        if youtube_dl is None:
+            import yt_dlp
+
+            # files are downloaded under a temporary name and only renamed
+            # into place once verified
+            yt_opts = {
+                "outtmpl": f"{self.temp_directory}/%(id)s/input.download.webm",
+                "continuedl": True,
+                "socket_timeout": self.config_loader.get_http_timeout()[1],
+                "concurrent_fragment_downloads": self.config_loader.get_download_fragments(),
+                "progress_hooks": [self.report_progress],
+            }
+
+            ingress_rate = self.bandwidth_governor.ingress.rate
+            if ingress_rate:
+                # yt-dlp smooths each download on its own, the governor keeps
+                # all of them together within the budget
+                yt_opts["ratelimit"] = max(
+                    ingress_rate // self.config_loader.get_download_workers(), 1
+                )
+
+            if self.config_loader.get_download_mode() == DownloadMode.AUDIO:
+                yt_opts["format"] = "bestaudio[ext=m4a]/bestaudio"
+                yt_opts["outtmpl"] = (
+                    f"{self.temp_directory}/%(id)s/audio_source.download.%(ext)s"
+                )
+            youtube_dl = yt_dlp.YoutubeDL(yt_opts)
+            self.thread_state.youtube_dl = youtube_dl
+
+        return youtube_dl
+
+    def consume_downloaded_bytes(self, progress: dict):
+        """Charges the bytes downloaded since the last hook to the ingress budget"""
+        filename = progress.get("filename")
+        downloaded = progress.get("downloaded_bytes") or 0
+
+        with self.progress_lock:
+            previous = self.downloaded_bytes.get(filename, 0)
+            if progress["status"] == "downloading":
+                self.downloaded_bytes[filename] = downloaded
+            else:
+                self.downloaded_bytes.pop(filename, None)
+
+        # blocking here holds back the download thread that called the hook
+        self.bandwidth_governor.consume_ingress(downloaded - previous)
+
+    def report_progress(self, progress: dict):
+        video_id = progress.get("info_dict", {}).get("id", "unknown")
+        job_logger = JobLogger(self.logger, video_id)
+        now = time.monotonic()
+        self.consume_downloaded_bytes(progress)
+
+        if progress["status"] == "downloading":
+            with self.progress_lock:
+                last_report = self.last_progress_report.get(video_id, 0)
+                if now - last_report < 5:
+                    return
+                self.last_progress_report[video_id] = now
+
+            speed = progress.get("speed") or 0
+            total = progress.get("total_bytes") or progress.get("total_bytes_estimate")
+            downloaded = progress.get("downloaded_bytes") or 0
+            job_logger.log_file_with_stdout(
+                f"downloading {utils.format_bytes(speed)}/s, "
+                f"{utils.format_bytes(downloaded)} of {utils.format_bytes(total)}",
+                LoggingLevel.Info,
+            )
+
+        elif progress["status"] == "finished":
+            elapsed = progress.get("elapsed") or 0
+            downloaded = progress.get("downloaded_bytes") or progress.get(
+                "total_bytes", 0
+            )
+            # size before any postprocessor rewrote the file, the hook runs
+            # in the thread doing the download
+            self.thread_state.transferred_bytes = downloaded
+            speed = downloaded / elapsed if elapsed else 0
+            job_logger.log_file_with_stdout(
+                f"downloaded {utils.format_bytes(downloaded)} "
+                f"at {utils.format_bytes(speed)}/s",
+                LoggingLevel.Info,
+            )
@@ -1,24 +1,53 @@
-from src.config import ConfigLoader
+from src.config import ConfigLoader, DownloadMode, PublishMode, RenderMode
 from src.logger import Logger, LoggingLevel
 import re
 import os
 import subprocess
 import math
 import time
-import requests
+import shutil
+import glob
 import src.utils as utils
+from src.processors.ffmpeg_runner import run_ffmpeg
+from src.processors.manifest import StageManifest
+from src.processors.thumbnail import download_thumbnail
+from src.metadata import VideoMetadataService, get_metadata_service
+from src.http_client import get_http_client
+
+# audio codecs the mp4 muxer accepts without re-encoding
+MP4_COMPATIBLE_AUDIO_CODECS = ("aac", "opus")
+# aac encoders by preference, libfdk_aac only exists in non-free builds
+AAC_ENCODERS = ("libfdk_aac", "aac")
 
 
 class VideoEditor:
-    def __init__(self, link: str, logger: Logger, configLoader: ConfigLoader):
+    def __init__(
+        self,
+        link: str,
+        logger: Logger,
+        configLoader: ConfigLoader,
+        metadata_service: None | VideoMetadataService = None,
+    ):
         self.link = link
         self.logger = logger
         self.failed = False
         self.already_as_mp4 = False
+        self.audio_only = configLoader.get_download_mode() == DownloadMode.AUDIO
+        self.stream_publish = configLoader.get_publish_mode() == PublishMode.STREAM
         self.final_output_video_duration: int = 30
+        self.loop_count: int = 1
         self.config_loader = configLoader
         self.is_windows = utils.is_windows()
+        self.scratch_directory = configLoader.get_scratch_directory()
         self.video_id = self.get_video_id()
+        self.metadata_service = metadata_service or get_metadata_service(
+            logger, configLoader
+        )
+        self.manifest = StageManifest(
+            job_directory=f"{self.scratch_directory}/{self.video_id}",
+            tool_version=self.config_loader.get_ffmpeg_version(),
+            logger=self.logger,
+        )
         self.logger.log_file_with_stdout(
             f"Started Editing [ {self.video_id} ]", LoggingLevel.Info
         )
@@ -33,59 +62,16 @@ class VideoEditor:
         return match.group(1) if match else None
 
     def get_video_title(self):
-        api_key = self.config_loader.get_youtube_api_key()
-        video_id = self.get_video_id()
-        api_url = f"https://www.googleapis.com/youtube/v3/videos?id={video_id}&part=snippet,contentDetails,statistics&key={api_key}"
-
-        try:
-            response = requests.get(api_url)
-
-            if not response.ok:
-                self.logger.log_file_with_stdout(
-                    f"Failed to request youtube. Status code :{response.status_code}",
-                    LoggingLevel.Error,
-                )
-                self.logger.log_file_with_stdout(
-                    f"Returning default name : <Viral song 1 hour looped>",
-                )
-
-                return "Viral Song"
+        title = self.metadata_service.get_title(self.video_id)
 
-            self.logger.log_file_only(
-                f"Youtube Response Headers with {response.headers}", LoggingLevel.Info
-            )
-            self.logger.log_file_only(
-                f"Extracted Title {response.json()['items'][0]['snippet']['title']}",
-                LoggingLevel.Info,
-            )
-
-            return response.json()["items"][0]["snippet"]["title"]
-
-        except requests.ConnectionError as conn_error:
+        if not title:
             self.logger.log_file_with_stdout(
-                f"Please check your internet connection !!", LoggingLevel.Error
-            )
-            self.logger.log_file_only(
-                f"Connection error Url :{conn_error.request.url}", LoggingLevel.Error
-            )
-            self.logger.log_file_only(
-                f"Connection error Headers :{conn_error.response.headers}",
-                LoggingLevel.Error,
-            )
-            self.logger.log_file_only(
-                f"Connection error Status code :{conn_error.response.status_code}",
+                f"Returning default name : <Viral song 1 hour looped>",
                 LoggingLevel.Error,
             )
-
             return "Viral Song"
 
-        except Exception as e:
-            self.logger.log_file_with_stdout(
-                "Fatal Error, Ending everything.", LoggingLevel.Fatal
-            )
-            self.logger.log_file_only(f"Fatal Error Requests {e}", LoggingLevel.Fatal)
-
-            return "Viral Song"
+        return title
 
     def generate_suffix(self):
         return f" {round(self.config_loader.get_final_video_duration() / 3600)} Hour looped"
@@ -112,16 +98,58 @@ class VideoEditor:
             return f"{sanitized_title} {suffix}"
 
     def edit(self):
-        self.convert_to_mp4()
+        render_mode = self.config_loader.get_render_mode()
+        if render_mode == RenderMode.SINGLE_PASS and self.stream_publish:
+            self.logger.log_file_with_stdout(
+                "Streaming publish loops the merged video, using multi pass render.",
+                LoggingLevel.Info,
+            )
+        elif render_mode == RenderMode.SINGLE_PASS:
+            if self.render_single_pass():
+                self.download_original_thumbnail()
+                return
+
+            self.logger.log_file_with_stdout(
+                "Single pass render not possible, falling back to multi pass render.",
+                LoggingLevel.Warn,
+            )
+
+        # the picture always comes from the asset, an audio-only download
+        # has nothing to convert
+        if not self.audio_only:
+            self.convert_to_mp4()
         self.extract_audio_from_video()
         self.merging_asset_and_audio_file()
         self.get_video_duration()
-        self.generate_concat_demuxer_file()
-        self.render_final_output_video()
+        self.calculate_loop_count()
+        if self.stream_publish:
+            # rendered by the uploader straight into the upload
+            self.create_output_directory()
+        else:
+            self.render_final_output_video()
         self.download_original_thumbnail()
 
+    def get_source_filename(self) -> str:
+        """Name of the file in files/<id> the song audio is read from"""
+        saved_dir = f"{self.scratch_directory}/{self.video_id}"
+
+        if self.audio_only:
+            for source in sorted(glob.glob(f"{saved_dir}/audio_source.*")):
+                if self.manifest.is_complete(source):
+                    return os.path.basename(source)
+
+            # audio-only downloads that could be muxed as they are were
+            # already stored as the audio artifact by the downloader
+            if self.manifest.is_complete(f"{saved_dir}/audio.m4a"):
+                return "audio.m4a"
+
+        if os.path.exists(f"{saved_dir}/input.mp4"):
+            return "input.mp4"
+
+        return "input.webm"
+
     def convert_to_mp4(self):
-        saved_dir = f"files/{self.video_id}"
+        saved_dir = f"{self.scratch_directory}/{self.video_id}"
         self.logger.log_file_with_stdout(
             f"Converting [ {saved_dir}/input.webm ] to mp4", LoggingLevel.Info
         )
@@ -134,28 +162,37 @@ class VideoEditor:
             )
             return
 
-        if os.path.exists(f"{saved_dir}/output.mp4"):
+        ffmpeg_path = self.config_loader.get_ffmpeg_path()
+        artifact = f"{saved_dir}/output.mp4"
+        args = [
+            ffmpeg_path,
+            "-i",
+            f"{saved_dir}/input.webm",
+            "-c",
+            "copy",
+            "-f",
+            "mp4",
+            self.manifest.temp_path(artifact),
+        ]
+        description = self.manifest.describe(
+            inputs=[f"{saved_dir}/input.webm"], params={"args": args[1:-1]}
+        )
+
+        if self.manifest.is_fresh(artifact, description):
             self.logger.log_file_with_stdout(
                 f"output.mp4 already exists. skipping this step!!", LoggingLevel.Info
             )
             return
 
-        ffmpeg_path = self.config_loader.get_ffmpeg_path()
-
         try:
-            process = subprocess.run(
-                args=[
-                    ffmpeg_path,
-                    "-i",
-                    f"{saved_dir}/input.webm",
-                    "-c",
-                    "copy",
-                    f"{saved_dir}/output.mp4",
-                ],
-                capture_output=True,
-                shell=self.is_windows,
-                check=True,
+            self.manifest.discard_partial(artifact)
+
+            process = run_ffmpeg(
+                args=args,
+                logger=self.logger,
+                is_windows=self.is_windows,
             )
+            self.manifest.commit(artifact, description)
 
             self.logger.log_file_only(
                 f"ffmpeg return code {process.returncode}", LoggingLevel.Info
@@ -167,16 +204,7 @@ class VideoEditor:
                 f"Completed converting to mp4 {saved_dir}/output.mp4", LoggingLevel.Info
             )
 
-            if process.stdout:
-                self.logger.log_file_only(
-                    f"Ffmpeg stdout {process.stdout}", LoggingLevel.Info
-                )
-                self.failed = False
-            if process.stderr:
-                self.logger.log_file_only(
-                    f"Ffmpeg stderr {process.stderr}", LoggingLevel.Info
-                )
-                self.failed = False
+            self.failed = False
 
         except subprocess.CalledProcessError as process_error:
             self.logger.log_file_with_stdout(
@@ -199,8 +227,6 @@ class VideoEditor:
             self.failed = True
 
     def extract_audio_from_video(self):
-        filename = "input.webm"
-
         if self.failed:
             self.logger.log_file_with_stdout(
                 f"previous step was failed quitting (extraction of audio) for this video entirely.",
@@ -208,38 +234,70 @@ class VideoEditor:
             )
             return
 
-        if self.already_as_mp4:
-            filename = "input.mp4"
+        filename = self.get_source_filename()
+        saved_dir = f"{self.scratch_directory}/{self.video_id}"
+
+        if filename == "audio.m4a":
+            self.logger.log_file_with_stdout(
+                "audio.m4a was downloaded directly. Skipping this step !!",
+                LoggingLevel.Info,
+            )
+            return
 
-        saved_dir = f"files/{self.video_id}"
         self.logger.log_file_with_stdout(
-            f"Extracting audio from [ {saved_dir}/input.webm ]", LoggingLevel.Info
+            f"Extracting audio from [ {saved_dir}/{filename} ]", LoggingLevel.Info
         )
 
-        if os.path.exists(f"{saved_dir}/audio.mp3"):
+        ffmpeg_path = self.config_loader.get_ffmpeg_path()
+
+        # stream copy when the mp4 container accepts the source codec, so the
+        # audio is encoded at most once (straight to aac) in the whole pipeline
+        audio_codec = self.get_audio_codec(f"{saved_dir}/{filename}")
+        if audio_codec in MP4_COMPATIBLE_AUDIO_CODECS:
             self.logger.log_file_with_stdout(
-                "audio.mp3 already exists. Skipping this step !!", LoggingLevel.Info
+                f"Source audio is {audio_codec}, copying it without re-encoding",
+                LoggingLevel.Info,
             )
-            return
+            audio_args = ["-c:a", "copy"]
+        else:
+            self.logger.log_file_with_stdout(
+                f"Source audio is {audio_codec}, transcoding it to aac",
+                LoggingLevel.Info,
+            )
+            audio_args = self.get_audio_encode_args()
+
+        artifact = f"{saved_dir}/audio.m4a"
+        args = [
+            ffmpeg_path,
+            "-i",
+            f"{saved_dir}/{filename}",
+            "-map",
+            "0:a:0",
+            "-vn",
+            *audio_args,
+            "-f",
+            "mp4",
+            self.manifest.temp_path(artifact),
+        ]
+        description = self.manifest.describe(
+            inputs=[f"{saved_dir}/{filename}"], params={"args": args[1:-1]}
+        )
 
-        ffmpeg_path = self.config_loader.get_ffmpeg_path()
+        if self.manifest.is_fresh(artifact, description):
+            self.logger.log_file_with_stdout(
+                "audio.m4a already exists. Skipping this step !!", LoggingLevel.Info
+            )
+            return
 
         try:
-            process = subprocess.run(
-                args=[
-                    ffmpeg_path,
-                    "-i",
-                    f"{saved_dir}/{filename}",
-                    "-q:a",
-                    "0",
-                    "-map",
-                    "a",
-                    f"{saved_dir}/audio.mp3",
-                ],
-                capture_output=True,
-                shell=self.is_windows,
-                check=True,
+            self.manifest.discard_partial(artifact)
+
+            process = run_ffmpeg(
+                args=args,
+                logger=self.logger,
+                is_windows=self.is_windows,
             )
+            self.manifest.commit(artifact, description)
 
             self.logger.log_file_only(
                 f"ffmpeg return code {process.returncode}", LoggingLevel.Info
@@ -252,16 +310,7 @@ class VideoEditor:
                 LoggingLevel.Info,
             )
 
-            if process.stdout:
-                self.logger.log_file_only(
-                    f"Ffmpeg stdout {process.stdout}", LoggingLevel.Info
-                )
-                self.failed = False
-            if process.stderr:
-                self.logger.log_file_only(
-                    f"Ffmpeg stderr {process.stderr}", LoggingLevel.Info
-                )
-                self.failed = False
+            self.failed = False
 
         except subprocess.CalledProcessError as process_error:
             self.logger.log_file_with_stdout(
@@ -292,39 +341,51 @@ class VideoEditor:
             )
             return
 
-        saved_dir = f"files/{self.video_id}"
+        saved_dir = f"{self.scratch_directory}/{self.video_id}"
         self.logger.log_file_with_stdout(
             f"Merging audio and asset file together", LoggingLevel.Info
         )
 
-        if os.path.exists(f"{saved_dir}/final_output.mp4"):
+        ffmpeg_path = self.config_loader.get_ffmpeg_path()
+        asset_video_path = self.config_loader.get_asset_video_path()
+        artifact = f"{saved_dir}/final_output.mp4"
+        args = [
+            ffmpeg_path,
+            "-i",
+            asset_video_path,
+            "-i",
+            f"{saved_dir}/audio.m4a",
+            "-map",
+            "0:v:0",
+            "-map",
+            "1:a:0",
+            "-c",
+            "copy",
+            "-f",
+            "mp4",
+            self.manifest.temp_path(artifact),
+        ]
+        description = self.manifest.describe(
+            inputs=[asset_video_path, f"{saved_dir}/audio.m4a"],
+            params={"args": args[1:-1]},
+        )
+
+        if self.manifest.is_fresh(artifact, description):
             self.logger.log_file_with_stdout(
                 "final_output.mp4 already exists. Skipping this step !!",
                 LoggingLevel.Info,
             )
             return
 
-        ffmpeg_path = self.config_loader.get_ffmpeg_path()
-        asset_video_path = self.config_loader.get_asset_video_path()
-
         try:
-            process = subprocess.run(
-                args=[
-                    ffmpeg_path,
-                    "-i",
-                    asset_video_path,
-                    "-i",
-                    f"{saved_dir}/audio.mp3",
-                    "-c:v",
-                    "copy",
-                    "-c:a",
-                    "aac",
-                    f"{saved_dir}/final_output.mp4",
-                ],
-                capture_output=True,
-                shell=self.is_windows,
-                check=True,
+            self.manifest.discard_partial(artifact)
+
+            process = run_ffmpeg(
+                args=args,
+                logger=self.logger,
+                is_windows=self.is_windows,
             )
+            self.manifest.commit(artifact, description)
 
             self.logger.log_file_only(
                 f"ffmpeg return code {process.returncode}", LoggingLevel.Info
@@ -336,16 +397,7 @@ class VideoEditor:
                 f"Completed merging asset and audio file", LoggingLevel.Info
             )
 
-            if process.stdout:
-                self.logger.log_file_only(
-                    f"Ffmpeg stdout {process.stdout}", LoggingLevel.Info
-                )
-                self.failed = False
-            if process.stderr:
-                self.logger.log_file_only(
-                    f"Ffmpeg stderr {process.stderr}", LoggingLevel.Info
-                )
-                self.failed = False
+            self.failed = False
 
         except subprocess.CalledProcessError as process_error:
             self.logger.log_file_with_stdout(
@@ -370,64 +422,162 @@ class VideoEditor:
             self.logger.log_file_only(f"Error {e}.", LoggingLevel.Fatal)
             self.failed = True
 
-    def generate_concat_demuxer_file(self):
+    def calculate_loop_count(self):
         if self.failed:
             self.logger.log_file_with_stdout(
-                f"previous step was failed quitting (concat-demuxer) for this video entirely.",
+                f"previous step was failed quitting (loop count) for this video entirely.",
                 LoggingLevel.Error,
             )
             return
 
-        saved_dir = f"files/{self.video_id}"
+        output_video_duration = self.config_loader.get_final_video_duration()
+        merged_video_duration = max(self.final_output_video_duration, 1)
+
+        # final_output.mp4 is looped by the demuxer (-stream_loop) while
+        # rendering, so it's opened once however long the final video is
+        self.loop_count = math.ceil(output_video_duration / merged_video_duration)
+
         self.logger.log_file_with_stdout(
-            f"Generating concat demuxer file.", LoggingLevel.Info
+            f"Looping final_output.mp4 {self.loop_count} times to reach {output_video_duration} s",
+            LoggingLevel.Info,
+        )
+
+    def render_final_output_video(self):
+        if self.failed:
+            self.logger.log_file_with_stdout(
+                f"previous step was failed (Rendering final video) for this video entirely.",
+                LoggingLevel.Error,
+            )
+            return
+
+        title = self.get_video_title()
+        filename = self.generate_output_filename(title)
+
+        saved_dir = f"{self.scratch_directory}/{self.video_id}"
+        self.logger.log_file_with_stdout(f"Rendering final video.", LoggingLevel.Info)
+
+        output_dir = self.config_loader.get_output_directory()
+
+        self.create_output_directory()
+
+        artifact = f"{output_dir}/{self.video_id}/{filename}.mp4"
+        args = self.get_render_args(self.manifest.temp_path(artifact))
+        description = self.manifest.describe(
+            inputs=[f"{saved_dir}/final_output.mp4"], params={"args": args[1:-1]}
         )
 
-        if os.path.exists(f"{saved_dir}/files.txt"):
+        if self.manifest.is_fresh(artifact, description):
             self.logger.log_file_with_stdout(
-                "files.txt already exists. Skipping this step !!", LoggingLevel.Info
+                f"Output was already created, Skipping this step !", LoggingLevel.Info
             )
             return
 
         try:
-            output_video_duration = self.config_loader.get_final_video_duration()
-            merged_video_duration = self.final_output_video_duration
+            start_time = time.time()
 
-            repititions = math.ceil(output_video_duration / merged_video_duration)
+            self.manifest.discard_partial(artifact)
 
-            with open(f"{saved_dir}/files.txt", "a") as demuxer_file:
-                for element in range(0, repititions):
-                    file_path = os.path.join(
-                        self.config_loader.pwd, saved_dir, "final_output.mp4"
-                    )
-                    self.logger.log_file_with_stdout(
-                        f"\t-{element} - {file_path}", LoggingLevel.Info
-                    )
-                    demuxer_file.write(f"file '{file_path}'\n")
+            process = run_ffmpeg(
+                args=args,
+                logger=self.logger,
+                is_windows=self.is_windows,
+                duration=self.loop_count * self.final_output_video_duration,
+            )
+            self.manifest.commit(artifact, description)
 
-        except Exception as e:
+            end_time = time.time()
+
+            self.logger.log_file_only(
+                f"ffmpeg return code {process.returncode}", LoggingLevel.Info
+            )
+            self.logger.log_file_only(
+                f"ffmpeg args : {process.args}", LoggingLevel.Info
+            )
+            self.logger.log_file_with_stdout(
+                f"Completed Rendering output file -> {output_dir}/{self.video_id}/{filename}.mp4",
+                LoggingLevel.Info,
+            )
             self.logger.log_file_with_stdout(
-                f"Failed to generate demuxer file.", LoggingLevel.Error
+                f"Render Time Took : {end_time - start_time} sec", LoggingLevel.Info
             )
+            # measured only, there's no concat render left to compare with,
+            # older logs have the render time of the concat list
+            elapsed = max(end_time - start_time, 0.001)
             self.logger.log_file_only(
-                f"Demuxer file generation Error: {e}", LoggingLevel.Error
+                f"Rendered {self.loop_count} loops, {elapsed / self.loop_count:.3f} sec "
+                f"per loop, {utils.format_bytes(os.path.getsize(artifact) / elapsed)}/s",
+                LoggingLevel.Info,
             )
 
-    def render_final_output_video(self):
-        if self.failed:
+            self.failed = False
+
+        except subprocess.CalledProcessError as process_error:
             self.logger.log_file_with_stdout(
-                f"previous step was failed (Rendering final video) for this video entirely.",
+                f"Failed Rendering final file", LoggingLevel.Error
+            )
+            self.logger.log_file_only(
+                f"ffmpeg args : {process_error.args}", LoggingLevel.Info
+            )
+            self.logger.log_file_only(
+                f"ffmpeg returned with status code {process_error.returncode}",
                 LoggingLevel.Error,
             )
-            return
+            self.logger.log_file_only(
+                f"ffmpeg stderr {process_error.stderr}", LoggingLevel.Error
+            )
+            self.failed = True
 
-        title = self.get_video_title()
-        filename = self.generate_output_filename(title)
+        except Exception as e:
+            self.logger.log_file_with_stdout(
+                f"Fatal error, quitting.", LoggingLevel.Fatal
+            )
+            self.logger.log_file_only(f"Error {e}.", LoggingLevel.Fatal)
+            self.failed = True
 
-        saved_dir = f"files/{self.video_id}"
-        self.logger.log_file_with_stdout(f"Rendering final video.", LoggingLevel.Info)
+    def get_audio_encode_args(self) -> list[str]:
+        encoder = self.config_loader.get_audio_encoder()
+        if encoder == "auto":
+            encoder = self.config_loader.get_toolchain().preferred_encoder(AAC_ENCODERS)
+
+        args = ["-c:a", encoder, "-b:a", self.config_loader.get_audio_bitrate()]
+        threads = self.config_loader.get_encoder_threads()
+        if threads:
+            args += ["-threads", str(threads)]
+        return args
+
+    def get_render_args(self, output: str, fragmented: bool = False) -> list[str]:
+        """ffmpeg args looping final_output.mp4 into `output`.
+
+        A fragmented mp4 starts with an empty moov and is written front to
+        back, so it can go to a pipe that's read while ffmpeg still runs.
+        """
+        args = [
+            self.config_loader.get_ffmpeg_path(),
+            "-stream_loop",
+            str(self.loop_count - 1),
+            "-i",
+            f"{self.scratch_directory}/{self.video_id}/final_output.mp4",
+            "-c",
+            "copy",
+        ]
+        if fragmented:
+            args += ["-movflags", "frag_keyframe+empty_moov"]
+
+        return args + ["-f", "mp4", output]
+
+    def prepare_stream_render(self) -> tuple[str, list[str], float]:
+        """Output filename, ffmpeg args writing the final video to stdout and
+        the duration of the video, for an already edited job"""
+        self.get_video_duration()
+        self.calculate_loop_count()
+        if self.failed:
+            raise Exception(f"{self.scratch_directory}/{self.video_id} isn't edited")
 
-        ffmpeg_path = self.config_loader.get_ffmpeg_path()
+        filename = self.generate_output_filename(self.get_video_title())
+        args = self.get_render_args("pipe:1", fragmented=True)
+        return filename, args, self.loop_count * self.final_output_video_duration
+
+    def create_output_directory(self):
         output_dir = self.config_loader.get_output_directory()
 
         if not os.path.exists(f"{output_dir}/{self.video_id}"):
@@ -441,32 +591,87 @@ class VideoEditor:
                 f"Output directory exists. Moving on", LoggingLevel.Info
             )
 
-        if os.path.exists(f"{output_dir}/{self.video_id}/{filename}.mp4"):
+    def render_single_pass(self) -> bool:
+        """Render the final video with a single ffmpeg invocation.
+
+        The asset video and the source audio are both looped by the demuxer
+        (`-stream_loop`) and stream copied into the final file which is cut at
+        `final-video-duration`, so nothing is written to files/<id> in between.
+        Returns False when the source audio can't be stream copied into mp4
+        or ffmpeg failed, in that case the caller should use the multi pass
+        render instead.
+        """
+        saved_dir = f"{self.scratch_directory}/{self.video_id}"
+        filename = self.get_source_filename()
+
+        self.logger.log_file_with_stdout(
+            f"Rendering final video in a single pass.", LoggingLevel.Info
+        )
+
+        audio_codec = self.get_audio_codec(f"{saved_dir}/{filename}")
+        if audio_codec not in MP4_COMPATIBLE_AUDIO_CODECS:
+            self.logger.log_file_only(
+                f"audio codec {audio_codec} of {saved_dir}/{filename} can't be stream copied into mp4",
+                LoggingLevel.Info,
+            )
+            return False
+
+        title = self.get_video_title()
+        output_filename = self.generate_output_filename(title)
+        output_dir = self.config_loader.get_output_directory()
+        output_path = f"{output_dir}/{self.video_id}/{output_filename}.mp4"
+
+        self.create_output_directory()
+
+        ffmpeg_path = self.config_loader.get_ffmpeg_path()
+        asset_video_path = self.config_loader.get_asset_video_path()
+        final_video_duration = self.config_loader.get_final_video_duration()
+
+        args = [
+            ffmpeg_path,
+            "-stream_loop",
+            "-1",
+            "-i",
+            asset_video_path,
+            "-stream_loop",
+            "-1",
+            "-i",
+            f"{saved_dir}/{filename}",
+            "-map",
+            "0:v:0",
+            "-map",
+            "1:a:0",
+            "-c",
+            "copy",
+            "-t",
+            str(final_video_duration),
+            "-f",
+            "mp4",
+            self.manifest.temp_path(output_path),
+        ]
+        description = self.manifest.describe(
+            inputs=[asset_video_path, f"{saved_dir}/{filename}"],
+            params={"args": args[1:-1]},
+        )
+
+        if self.manifest.is_fresh(output_path, description):
             self.logger.log_file_with_stdout(
                 f"Output was already created, Skipping this step !", LoggingLevel.Info
             )
-            return
+            return True
 
         try:
             start_time = time.time()
 
-            process = subprocess.run(
-                args=[
-                    ffmpeg_path,
-                    "-f",
-                    "concat",
-                    "-safe",
-                    "0",
-                    "-i",
-                    f"{saved_dir}/files.txt",
-                    "-c",
-                    "copy",
-                    f"{output_dir}/{self.video_id}/{filename}.mp4",
-                ],
-                capture_output=True,
-                shell=self.is_windows,
-                check=True,
+            self.manifest.discard_partial(output_path)
+
+            process = run_ffmpeg(
+                args=args,
+                logger=self.logger,
+                is_windows=self.is_windows,
+                duration=final_video_duration,
             )
+            self.manifest.commit(output_path, description)
 
             end_time = time.time()
 
@@ -477,27 +682,18 @@ class VideoEditor:
                 f"ffmpeg args : {process.args}", LoggingLevel.Info
             )
             self.logger.log_file_with_stdout(
-                f"Completed Rendering output file -> {output_dir}/{self.video_id}/{filename}.mp4",
+                f"Completed Rendering output file -> {output_path}",
                 LoggingLevel.Info,
             )
             self.logger.log_file_with_stdout(
                 f"Render Time Took : {end_time - start_time} sec", LoggingLevel.Info
             )
 
-            if process.stdout:
-                self.logger.log_file_only(
-                    f"ffmpeg stdout {process.stdout}", LoggingLevel.Info
-                )
-                self.failed = False
-            if process.stderr:
-                self.logger.log_file_only(
-                    f"ffmpeg stderr {process.stderr}", LoggingLevel.Info
-                )
-                self.failed = False
+            return True
 
         except subprocess.CalledProcessError as process_error:
             self.logger.log_file_with_stdout(
-                f"Failed Rendering final file", LoggingLevel.Error
+                f"Failed Rendering final file in a single pass", LoggingLevel.Error
             )
             self.logger.log_file_only(
                 f"ffmpeg args : {process_error.args}", LoggingLevel.Info
@@ -509,58 +705,84 @@ class VideoEditor:
             self.logger.log_file_only(
                 f"ffmpeg stderr {process_error.stderr}", LoggingLevel.Error
             )
-            self.failed = True
 
         except Exception as e:
             self.logger.log_file_with_stdout(
-                f"Fatal error, quitting.", LoggingLevel.Fatal
+                f"Failed Rendering final file in a single pass", LoggingLevel.Error
             )
-            self.logger.log_file_only(f"Error {e}.", LoggingLevel.Fatal)
-            self.failed = True
+            self.logger.log_file_only(f"Error {e}.", LoggingLevel.Error)
 
-    def download_original_thumbnail(self):
-        output_dir = self.config_loader.get_output_directory()
-        video_id = self.get_video_id()
+        # nothing was committed, the multi pass render starts from scratch
+        return False
 
-        api_url = f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+    def get_audio_codec(self, media_path: str) -> None | str:
+        ffprobe_path = self.config_loader.get_toolchain().path("ffprobe")
 
         try:
-            response = requests.get(api_url)
-
-            if not response.ok or response.status_code == 404:
-                self.logger.log_file_with_stdout(
-                    f"Failed to request youtube. Status code :{response.status_code}",
-                    LoggingLevel.Error,
-                )
-                self.logger.log_file_with_stdout(
-                    f"Thumbnail JSON Response : {response.json()}", LoggingLevel.Error
-                )
-
-            else:
-                with open(
-                    f"{output_dir}/{video_id}/{video_id}.jpg", "wb"
-                ) as thumbnail_file:
-                    thumbnail_file.write(response.content)
+            process = subprocess.run(
+                args=[
+                    ffprobe_path,
+                    "-v",
+                    "error",
+                    "-select_streams",
+                    "a:0",
+                    "-show_entries",
+                    "stream=codec_name",
+                    "-of",
+                    "csv=p=0",
+                    media_path,
+                ],
+                capture_output=True,
+                shell=self.is_windows,
+                check=True,
+            )
 
-            self.logger.log_file_with_stdout(
-                f"Successfully downloaded thumbnail file : {output_dir}/{video_id}/{video_id}.jpg",
+            audio_codec = process.stdout.decode().strip()
+            self.logger.log_file_only(
+                f"Probed audio codec of {media_path} -> {audio_codec}",
                 LoggingLevel.Info,
             )
+            return audio_codec if audio_codec else None
 
-        except requests.ConnectionError as conn_error:
-            self.logger.log_file_with_stdout(
-                f"connection error while downloading thumbnail.", LoggingLevel.Fatal
+        except subprocess.CalledProcessError as process_error:
+            self.logger.log_file_only(
+                f"ffprobe returned with status code {process_error.returncode}",
+                LoggingLevel.Error,
+            )
+            self.logger.log_file_only(
+                f"ffprobe stderr {process_error.stderr}", LoggingLevel.Error
             )
+            return None
+
+        except Exception as e:
             self.logger.log_file_only(
-                f"Connection Error {conn_error}", LoggingLevel.Fatal
+                f"Error probing audio codec {e}.", LoggingLevel.Error
             )
+            return None
+
+    def download_original_thumbnail(self):
+        output_dir = self.config_loader.get_output_directory()
+        cached_thumbnail = f"{self.scratch_directory}/{self.video_id}/thumbnail.jpg"
+
+        # the pipeline fetches thumbnails right after downloading
+        if not os.path.exists(cached_thumbnail) and not download_thumbnail(
+            self.video_id,
+            cached_thumbnail,
+            get_http_client(self.config_loader),
+            self.logger,
+        ):
+            return
 
+        try:
+            shutil.copyfile(
+                cached_thumbnail, f"{output_dir}/{self.video_id}/{self.video_id}.jpg"
+            )
         except Exception as e:
             self.logger.log_file_with_stdout(
-                f"Unexpected error while parsing image.", LoggingLevel.Fatal
+                f"Unexpected error while copying thumbnail.", LoggingLevel.Error
             )
             self.logger.log_file_only(
-                f"Thumbnail Download Error Details {e}.", LoggingLevel.Fatal
+                f"Thumbnail Copy Error Details {e}.", LoggingLevel.Error
             )
 
     def get_video_duration(self):
@@ -571,12 +793,12 @@ class VideoEditor:
             )
             return
 
-        saved_dir = f"files/{self.video_id}"
+        saved_dir = f"{self.scratch_directory}/{self.video_id}"
         self.logger.log_file_with_stdout(
             f"Calculating video duration.", LoggingLevel.Info
         )
 
-        ffprobe_path = self.config_loader.get_ffprobe_path()
+        ffprobe_path = self.config_loader.get_toolchain().path("ffprobe")
 
         try:
             process = subprocess.run(
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.config import ConfigLoader
+from src.logger import JobLogger, Logger, LoggingLevel
+from src.processors.editor import VideoEditor
+from src.metadata import VideoMetadataService, get_metadata_service
+import src.utils as utils
+
+
+def edit_video(
+    link: str,
+    logger: Logger,
+    config_loader: ConfigLoader,
+    metadata_service: None | VideoMetadataService = None,
+) -> bool:
+    """Edits a single video, returns True when every step succeeded"""
+    job_logger = JobLogger(logger, utils.extract_video_id(link) or link)
+
+    try:
+        video_editor = VideoEditor(
+            link=link,
+            logger=job_logger,
+            configLoader=config_loader,
+            metadata_service=metadata_service,
+        )
+        video_editor.edit()
+        return not video_editor.failed
+
+    except Exception as e:
+        job_logger.log_file_with_stdout(
+            f"Unexpected error while editing {link}", LoggingLevel.Error
+        )
+        job_logger.log_file_only(f"Editing Error {e}", LoggingLevel.Error)
+        return False
+
+
+def edit_videos(
+    links: list[str], logger: Logger, config_loader: ConfigLoader
+) -> dict[str, bool]:
+    """Edits the videos concurrently and returns the result of each link.
+
+    Every step of the editor is an ffmpeg subprocess working inside its own
+    files/<video_id> directory, so threads are enough to keep every core busy
+    while the jobs stay isolated from each other.
+    """
+    # the same video twice would have two jobs writing into one directory
+    links = list(dict.fromkeys(links))
+    workers = min(config_loader.get_editor_workers(), max(len(links), 1))
+
+    metadata_service = get_metadata_service(logger, config_loader)
+    metadata_service.prefetch(utils.extract_video_id(link) for link in links)
+    results: dict[str, bool] = {}
+
+    logger.log_file_with_stdout(
+        f"Editing {len(links)} videos with {workers} workers", LoggingLevel.Info
+    )
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="editor"
+    ) as executor:
+        futures = {
+            executor.submit(
+                edit_video, link, logger, config_loader, metadata_service
+            ): link
+            for link in links
+        }
+
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    failed = [link for link, succeeded in results.items() if not succeeded]
+    logger.log_file_with_stdout(
+        f"Edited {len(results) - len(failed)}/{len(results)} videos", LoggingLevel.Info
+    )
+    if failed:
+        logger.log_file_with_stdout(
+            f"Failed editing videos: {failed}", LoggingLevel.Error
+        )
+
+    return results
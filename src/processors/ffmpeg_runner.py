@@ -0,0 +1,137 @@
+from collections import deque
+import subprocess
+import threading
+import time
+
+from src.logger import Logger, LoggingLevel
+import src.utils as utils
+
+
+class FfmpegProgress:
+    """Latest values reported by `ffmpeg -progress`"""
+
+    def __init__(self, duration: None | float):
+        self.duration = duration
+        self.frame = 0
+        self.out_time = 0.0
+        self.total_size = 0
+        self.speed: None | float = None
+
+    def update(self, key: str, value: str):
+        try:
+            if key == "frame":
+                self.frame = int(value)
+            elif key == "out_time_us":
+                self.out_time = int(value) / 1_000_000
+            elif key == "total_size":
+                self.total_size = int(value)
+            elif key == "speed":
+                self.speed = float(value.rstrip("x"))
+        except ValueError:
+            # ffmpeg reports N/A until it has a value
+            pass
+
+    def eta(self) -> None | float:
+        if not self.duration or not self.speed:
+            return None
+        return max(self.duration - self.out_time, 0) / self.speed
+
+    def describe(self) -> str:
+        speed = f"{self.speed:.1f}x" if self.speed else "N/A"
+        eta = self.eta()
+        eta = f"{eta:.0f} s" if eta is not None else "N/A"
+        return (
+            f"speed {speed}, frame {self.frame}, time {self.out_time:.0f} s, "
+            f"size {utils.format_bytes(self.total_size)}, eta {eta}"
+        )
+
+
+def open_ffmpeg_stream(
+    args: list[str], is_windows: bool, stderr_lines: int = 200
+) -> tuple[subprocess.Popen, deque[str]]:
+    """Starts ffmpeg writing its output to stdout, for the caller to read.
+
+    stderr is drained in the background so ffmpeg never blocks on it, the
+    returned deque holds its last `stderr_lines` lines.
+    """
+    args = [args[0], "-nostats", *args[1:]]
+    stderr_tail: deque[str] = deque(maxlen=stderr_lines)
+
+    process = subprocess.Popen(
+        args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        shell=is_windows,
+    )
+
+    def read_stderr():
+        for line in process.stderr:
+            stderr_tail.append(line.decode(errors="replace").rstrip())
+
+    threading.Thread(target=read_stderr, daemon=True).start()
+    return process, stderr_tail
+
+
+def run_ffmpeg(
+    args: list[str],
+    logger: Logger,
+    is_windows: bool,
+    duration: None | float = None,
+    report_interval: float = 5,
+    stderr_lines: int = 200,
+) -> subprocess.CompletedProcess:
+    """Runs ffmpeg while streaming its progress into the log.
+
+    `-progress pipe:1` is parsed line by line as ffmpeg writes it, so long
+    renders report speed, frames, size and ETA (when `duration` is known)
+    every `report_interval` seconds. Only the last `stderr_lines` lines of
+    stderr are kept and they're attached to the CalledProcessError raised on
+    failure, a successful run never logs them.
+    """
+    # -y and no stdin, a leftover output must never stop the run at an
+    # overwrite prompt, and concurrent jobs must not read the terminal
+    args = [args[0], "-y", "-nostats", "-progress", "pipe:1", *args[1:]]
+    stderr_tail: deque[str] = deque(maxlen=stderr_lines)
+    progress = FfmpegProgress(duration)
+
+    process = subprocess.Popen(
+        args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        shell=is_windows,
+        text=True,
+        errors="replace",
+    )
+
+    def read_stderr():
+        for line in process.stderr:
+            stderr_tail.append(line.rstrip())
+
+    stderr_reader = threading.Thread(target=read_stderr, daemon=True)
+    stderr_reader.start()
+
+    last_report = time.monotonic()
+    for line in process.stdout:
+        key, _, value = line.strip().partition("=")
+        if key != "progress":
+            progress.update(key, value)
+            continue
+
+        now = time.monotonic()
+        if value == "end" or now - last_report >= report_interval:
+            logger.log_file_with_stdout(
+                f"ffmpeg progress: {progress.describe()}", LoggingLevel.Info
+            )
+            last_report = now
+
+    returncode = process.wait()
+    stderr_reader.join()
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(
+            returncode, args, stderr="\n".join(stderr_tail)
+        )
+
+    return subprocess.CompletedProcess(args, returncode)
@@ -0,0 +1,135 @@
+import datetime
+import hashlib
+import json
+import os
+import threading
+
+from src.logger import Logger, LoggingLevel
+import src.utils as utils
+
+
+class StageManifest:
+    """Keeps track of how every artifact of a job was produced.
+
+    Each artifact is recorded with the content hashes of its inputs, the
+    tool version and the parameters used to make it. A stage is skipped only
+    when all of them are unchanged and the artifact on disk still has the
+    recorded size, so a truncated file or a changed config gets rebuilt.
+    The manifest lives at files/<video_id>/manifest.json.
+    """
+
+    def __init__(self, job_directory: str, tool_version: str, logger: Logger):
+        self.path = os.path.join(job_directory, "manifest.json")
+        self.tool_version = tool_version
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.data: dict = {"artifacts": {}, "hashes": {}}
+
+        try:
+            self.data = utils.load_json(self.path, self.data)
+        except Exception as e:
+            self.logger.log_file_with_stdout(
+                f"Manifest {self.path} is unreadable, rebuilding every stage",
+                LoggingLevel.Warn,
+            )
+            self.logger.log_file_only(f"Manifest Error {e}", LoggingLevel.Warn)
+
+        self.data.setdefault("artifacts", {})
+        self.data.setdefault("hashes", {})
+
+    def describe(self, inputs: list[str], params: dict) -> dict:
+        """Everything an artifact depends on, its cache key is derived from this"""
+        description = {
+            "inputs": {path: self.hash_file(path) for path in inputs},
+            "tool": self.tool_version,
+            "params": params,
+        }
+        description["key"] = hashlib.sha256(
+            json.dumps(description, sort_keys=True).encode()
+        ).hexdigest()
+        return description
+
+    def is_fresh(self, artifact: str, description: dict) -> bool:
+        entry = self.data["artifacts"].get(artifact)
+        if not entry or not entry.get("completed_at"):
+            return False
+
+        if entry.get("key") != description["key"]:
+            self.logger.log_file_only(
+                f"Cache key of {artifact} changed, rebuilding", LoggingLevel.Info
+            )
+            return False
+
+        try:
+            return os.path.getsize(artifact) == entry["size"]
+        except OSError:
+            return False
+
+    def is_complete(self, artifact: str) -> bool:
+        """True when the artifact was fully written, whatever its inputs were"""
+        entry = self.data["artifacts"].get(artifact)
+        if not entry or not entry.get("completed_at"):
+            return False
+
+        try:
+            return os.path.getsize(artifact) == entry["size"]
+        except OSError:
+            return False
+
+    def temp_path(self, artifact: str) -> str:
+        """Path the stage should write to, it's renamed by commit()"""
+        return f"{artifact}.partial"
+
+    def discard_partial(self, artifact: str):
+        """Removes what a crashed or failed run left at the temporary path"""
+        temp_path = self.temp_path(artifact)
+        if os.path.exists(temp_path):
+            self.logger.log_file_only(
+                f"Removing stale {temp_path} of an interrupted run", LoggingLevel.Info
+            )
+            os.remove(temp_path)
+
+    def commit(self, artifact: str, description: dict):
+        temp_path = self.temp_path(artifact)
+        if os.path.exists(temp_path):
+            os.replace(temp_path, artifact)
+
+        entry = dict(description)
+        entry["size"] = os.path.getsize(artifact)
+        entry["completed_at"] = datetime.datetime.now().isoformat()
+
+        with self.lock:
+            self.data["artifacts"][artifact] = entry
+            self.save()
+
+    def hash_file(self, path: str) -> None | str:
+        """sha256 of the file, reused while its size and mtime are unchanged"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self.lock:
+            cached = self.data["hashes"].get(path)
+        if (
+            cached
+            and cached["size"] == stat.st_size
+            and cached["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return cached["sha256"]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(block)
+
+        with self.lock:
+            self.data["hashes"][path] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": digest.hexdigest(),
+            }
+        return digest.hexdigest()
+
+    def save(self):
+        utils.save_json(self.path, self.data)
@@ -0,0 +1,45 @@
+import requests
+
+from src.http_client import HttpClient
+from src.logger import Logger, LoggingLevel
+
+
+def download_thumbnail(
+    video_id: str, save_path: str, http_client: HttpClient, logger: Logger
+) -> bool:
+    api_url = f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+
+    try:
+        response = http_client.get(api_url)
+
+        if not response.ok:
+            logger.log_file_with_stdout(
+                f"Failed to request youtube. Status code :{response.status_code}",
+                LoggingLevel.Error,
+            )
+            return False
+
+        with open(save_path, "wb") as thumbnail_file:
+            thumbnail_file.write(response.content)
+
+        logger.log_file_with_stdout(
+            f"Successfully downloaded thumbnail file : {save_path}",
+            LoggingLevel.Info,
+        )
+        return True
+
+    except requests.ConnectionError as conn_error:
+        logger.log_file_with_stdout(
+            f"connection error while downloading thumbnail.", LoggingLevel.Error
+        )
+        logger.log_file_only(f"Connection Error {conn_error}", LoggingLevel.Error)
+        return False
+
+    except Exception as e:
+        logger.log_file_with_stdout(
+            f"Unexpected error while downloading thumbnail.", LoggingLevel.Error
+        )
+        logger.log_file_only(
+            f"Thumbnail Download Error Details {e}.", LoggingLevel.Error
+        )
+        return False
@@ -1,8 +1,5 @@
 from .logger import Logger, LoggingLevel
 from .config import ConfigLoader
-from .uploader.youtube_uploader import YouTubeUploader
-from .uploader.uploader import Uploader
-from .processors.editor import VideoEditor
 
 import sys
 from enum import Enum
@@ -64,7 +61,7 @@ class Randomizer:
         self.usage_mode = usage_mode
         self.logger = logger
         self.config_loader = config_loader
-        self.temp_directory = "files"
+        self.temp_directory = config_loader.get_scratch_directory()
 
     def get_videos_according_to_usage_mode(self) -> list[str]:
         self.config_loader.check_for_ffmpeg(self.logger)
@@ -90,13 +87,15 @@ class Randomizer:
         return videos
 
     def start_editing(self, videos: list[str]):
-        for vid in videos:
-            editor = VideoEditor(
-                link=vid, logger=self.logger, configLoader=self.config_loader
-            )
-            editor.edit()
+        from .processors.editor_pool import edit_videos
+
+        edit_videos(videos, logger=self.logger, config_loader=self.config_loader)
 
     def start_uploading_to_youtube(self):
+        # imported here, help.py imports this module for RandomizerUsageMode
+        from .uploader.youtube_uploader import YouTubeUploader
+        from .uploader.uploader import Uploader
+
         youtube_uploader = YouTubeUploader(
             logger=self.logger,
             config_loader=self.config_loader,
@@ -0,0 +1,192 @@
+import os
+import shutil
+import subprocess
+import threading
+
+from src.logger import Logger, LoggingLevel
+import src.utils as utils
+
+# arguments printing the version of each tool on the first line of stdout
+VERSION_ARGS = {
+    "ffmpeg": ["-version"],
+    "ffprobe": ["-version"],
+    "yt-dlp": ["--version"],
+}
+
+
+class Toolchain:
+    """The external binaries of the pipeline, probed once per install.
+
+    Every tool is resolved to an absolute path once per run. What it reports
+    about itself (version, ffmpeg's encoders and muxers) is cached on disk,
+    keyed by that path and the mtime of the binary. A run with the same
+    tools installed spawns none of the probes, and an upgraded binary gets
+    probed again because its mtime changed.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        paths: dict[str, str],
+        is_windows: bool,
+        cache_path: str = "files/toolchain_cache.json",
+    ):
+        self.logger = logger
+        self.paths = paths
+        self.is_windows = is_windows
+        self.cache_path = cache_path
+        self.lock = threading.Lock()
+        self.resolved: dict[str, None | str] = {}
+        self.cache: dict[str, dict] = {}
+
+        try:
+            self.cache = utils.load_json(self.cache_path, self.cache)
+        except Exception as e:
+            self.logger.log_file_only(
+                f"Ignoring unreadable toolchain cache {self.cache_path} {e}",
+                LoggingLevel.Warn,
+            )
+
+    def resolve(self, tool: str) -> None | str:
+        """Absolute path of the tool, None when it isn't installed"""
+        with self.lock:
+            if tool not in self.resolved:
+                configured = self.paths[tool]
+                found = shutil.which(configured)
+                self.resolved[tool] = os.path.abspath(found) if found else None
+                self.logger.log_file_only(
+                    f"Resolved {tool} ({configured}) -> {self.resolved[tool]}",
+                    LoggingLevel.Info,
+                )
+
+            return self.resolved[tool]
+
+    def path(self, tool: str) -> str:
+        """Path to run the tool with, the configured one if it can't be resolved"""
+        return self.resolve(tool) or self.paths[tool]
+
+    def version(self, tool: str) -> None | str:
+        entry = self._get_entry(tool)
+        if entry is None:
+            return None
+
+        if "version" not in entry:
+            output = self._run(tool, VERSION_ARGS[tool])
+            if output is None:
+                return None
+
+            lines = output.strip().splitlines()
+            self._update_entry(tool, version=lines[0].strip() if lines else "")
+
+        return entry["version"]
+
+    def encoders(self) -> set[str]:
+        return self._get_ffmpeg_list("encoders", ["-hide_banner", "-encoders"])
+
+    def muxers(self) -> set[str]:
+        return self._get_ffmpeg_list("muxers", ["-hide_banner", "-muxers"])
+
+    def has_encoder(self, encoder: str) -> bool:
+        return encoder in self.encoders()
+
+    def has_muxer(self, muxer: str) -> bool:
+        return muxer in self.muxers()
+
+    def preferred_encoder(self, candidates: tuple[str, ...]) -> str:
+        """First of the candidates ffmpeg was built with, the last as fallback"""
+        encoders = self.encoders()
+        for candidate in candidates:
+            if candidate in encoders:
+                return candidate
+        return candidates[-1]
+
+    def _get_ffmpeg_list(self, kind: str, args: list[str]) -> set[str]:
+        entry = self._get_entry("ffmpeg")
+        if entry is None:
+            return set()
+
+        if kind not in entry:
+            output = self._run("ffmpeg", args)
+            if output is None:
+                return set()
+            self._update_entry("ffmpeg", **{kind: parse_ffmpeg_list(output)})
+
+        return set(entry[kind])
+
+    def _get_entry(self, tool: str) -> None | dict:
+        """Cached facts about the tool, reset when its binary changed"""
+        path = self.resolve(tool)
+        if path is None:
+            return None
+
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        with self.lock:
+            entry = self.cache.get(path)
+            if entry is None or entry.get("mtime_ns") != mtime_ns:
+                entry = {"tool": tool, "mtime_ns": mtime_ns}
+                self.cache[path] = entry
+            return entry
+
+    def _update_entry(self, tool: str, **facts):
+        with self.lock:
+            self.cache[self.resolved[tool]].update(facts)
+            self._save()
+
+    def _run(self, tool: str, args: list[str]) -> None | str:
+        try:
+            process = subprocess.run(
+                [self.path(tool), *args],
+                capture_output=True,
+                shell=self.is_windows,
+                check=True,
+            )
+            return process.stdout.decode(errors="replace")
+
+        except subprocess.CalledProcessError as process_error:
+            self.logger.log_file_only(
+                f"{tool} {args} returned with status code {process_error.returncode}",
+                LoggingLevel.Error,
+            )
+            self.logger.log_file_only(
+                f"{tool} stderr {process_error.stderr}", LoggingLevel.Error
+            )
+            return None
+
+        except Exception as e:
+            self.logger.log_file_only(
+                f"Failed probing {tool} {args} {e}", LoggingLevel.Error
+            )
+            return None
+
+    def _save(self):
+        try:
+            utils.save_json(self.cache_path, self.cache)
+        except Exception as e:
+            self.logger.log_file_only(
+                f"Failed to save toolchain cache {e}", LoggingLevel.Error
+            )
+
+
+def parse_ffmpeg_list(output: str) -> list[str]:
+    """Names listed by `ffmpeg -encoders` / `-muxers`.
+
+    Both print a legend, a line of dashes and then one entry per line as
+    flags followed by the name, muxers can list several names at once
+    (`E mp4,m4a ...`).
+    """
+    names: list[str] = []
+    in_list = False
+
+    for line in output.splitlines():
+        fields = line.split()
+        if not in_list:
+            in_list = line.strip() != "" and line.strip(" -") == ""
+            continue
+        if len(fields) >= 2:
+            names.extend(fields[1].split(","))
+
+    return sorted(set(names))
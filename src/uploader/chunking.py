@@ -0,0 +1,70 @@
+import time
+
+from src.logger import Logger, LoggingLevel
+
+# resumable uploads only accept chunks in multiples of 256 KiB
+CHUNK_GRANULARITY = 256 * 1024
+
+
+class AdaptiveChunkSizer:
+    """Sizes the chunks of one resumable upload after the measured throughput.
+
+    Every chunk costs a request round trip, so the next chunk is sized to
+    take about `target_seconds` at the speed the last one was sent with.
+    Growth is capped at doubling per chunk so one lucky measurement can't
+    blow the size up, and an error halves it so retries resend less data.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        initial_size: int,
+        min_size: int = 1024 * 1024,
+        max_size: int = 128 * 1024 * 1024,
+        target_seconds: float = 8,
+    ):
+        self.logger = logger
+        self.min_size = self.round_size(min_size)
+        self.max_size = self.round_size(max_size)
+        self.target_seconds = target_seconds
+        self.chunk_size = self.clamp(initial_size)
+        self.sent_bytes = 0
+        self.elapsed = 0.0
+        self.started_at: None | float = None
+
+    def round_size(self, size: float) -> int:
+        return max(int(size) // CHUNK_GRANULARITY, 1) * CHUNK_GRANULARITY
+
+    def clamp(self, size: float) -> int:
+        return min(max(self.round_size(size), self.min_size), self.max_size)
+
+    def start_chunk(self):
+        self.started_at = time.monotonic()
+
+    def record_chunk(self, size: int):
+        elapsed = time.monotonic() - self.started_at
+        self.sent_bytes += size
+        self.elapsed += elapsed
+        if size <= 0 or elapsed <= 0:
+            return
+
+        throughput = size / elapsed
+        target_size = throughput * self.target_seconds
+        self.chunk_size = self.clamp(min(target_size, self.chunk_size * 2))
+        self.logger.log_file_only(
+            f"chunk of {size / 1024 / 1024:.1f} MB sent in {elapsed:.2f} s "
+            f"({throughput / 1024 / 1024:.2f} MB/s), next chunk "
+            f"{self.chunk_size / 1024 / 1024:.2f} MB",
+            LoggingLevel.Info,
+        )
+
+    def record_error(self):
+        self.chunk_size = self.clamp(self.chunk_size / 2)
+        self.logger.log_file_only(
+            f"chunk failed, next chunk {self.chunk_size / 1024 / 1024:.2f} MB",
+            LoggingLevel.Warn,
+        )
+
+    def effective_speed(self) -> float:
+        """Average bytes per second spent inside chunk requests"""
+        return self.sent_bytes / self.elapsed if self.elapsed else 0
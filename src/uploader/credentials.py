@@ -0,0 +1,115 @@
+import datetime
+import threading
+
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+
+from src.logger import Logger, LoggingLevel
+
+
+class CredentialManager:
+    """Keeps the OAuth access token of a long run valid.
+
+    Access tokens live for an hour while a batch of long uploads can take
+    many, so a background thread refreshes the token `refresh_margin`
+    seconds before it expires and saves it for the next run. Upload workers
+    hold the Credentials through LockedCredentials, so the refreshes their
+    transports do on a 401 go through the same lock and a refresh swaps the
+    token every worker sends with its next request.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        credentials: Credentials,
+        token_file: str,
+        refresh_margin: float = 300,
+        retry_interval: float = 60,
+    ):
+        self.logger = logger
+        self.credentials = credentials
+        self.token_file = token_file
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread: None | threading.Thread = None
+
+    def start(self):
+        if self.thread is not None or not self.credentials.refresh_token:
+            return
+
+        self.thread = threading.Thread(
+            target=self.keep_fresh, name="credential-refresh", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def seconds_until_refresh(self) -> float:
+        if self.credentials.expiry is None:
+            return self.retry_interval
+
+        # google-auth keeps expiry as a naive UTC datetime
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return (self.credentials.expiry - now).total_seconds() - self.refresh_margin
+
+    def keep_fresh(self):
+        while not self.stopped.wait(max(self.seconds_until_refresh(), 0)):
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.log_file_with_stdout(
+                    f"Failed to refresh the YouTube access token, retrying in "
+                    f"{self.retry_interval:.0f} sec",
+                    LoggingLevel.Warn,
+                )
+                self.logger.log_file_only(f"Refresh Error {e}", LoggingLevel.Warn)
+                if self.stopped.wait(self.retry_interval):
+                    return
+
+    def refresh(self, request=None, stale_token: None | str = None):
+        """Refreshes the token and saves it to the token file.
+
+        A worker passes the token it found stale, if another one replaced it
+        while this one waited for the lock there's nothing left to refresh.
+        """
+        with self.lock:
+            if stale_token is not None and self.credentials.token != stale_token:
+                return
+            self.credentials.refresh(request or Request())
+            with open(self.token_file, "w") as token:
+                token.write(self.credentials.to_json())
+
+        self.logger.log_file_only(
+            f"Refreshed the YouTube access token, valid until "
+            f"{self.credentials.expiry} UTC",
+            LoggingLevel.Info,
+        )
+
+
+class LockedCredentials:
+    """The managed Credentials as seen by one worker's AuthorizedHttp.
+
+    AuthorizedHttp refreshes its credentials by itself when the token
+    expired or a request got a 401, from whichever worker thread hit it.
+    Those refreshes are sent through CredentialManager.refresh so only one
+    runs at a time, workers that waited for a refresh in progress use its
+    token instead of refreshing again. Everything else is read from the
+    shared Credentials.
+    """
+
+    def __init__(self, manager: CredentialManager):
+        self.manager = manager
+
+    def __getattr__(self, name: str):
+        return getattr(self.manager.credentials, name)
+
+    def refresh(self, request):
+        self.manager.refresh(request, stale_token=self.manager.credentials.token)
+
+    def before_request(self, request, method, url, headers):
+        if not self.manager.credentials.valid:
+            self.refresh(request)
+        self.manager.credentials.before_request(request, method, url, headers)
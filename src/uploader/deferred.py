@@ -0,0 +1,66 @@
+import datetime
+import os
+import threading
+
+from src.logger import Logger, LoggingLevel
+import src.utils as utils
+
+
+class DeferredUploads:
+    """Jobs whose upload didn't fit in the daily quota, kept across runs.
+
+    A deferred job stays listed until it's uploaded, so the next run picks
+    it up once the quota window reset even when its link is gone from the
+    links file. It's kept next to the upload ledger so --clean doesn't drop
+    it, jobs whose output was removed are forgotten on load.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        output_directory: str,
+        path: str = "upload_deferred.json",
+    ):
+        self.logger = logger
+        self.path = path
+        self.lock = threading.Lock()
+        self.jobs: dict[str, str] = {}
+
+        try:
+            self.jobs = utils.load_json(self.path, self.jobs)
+        except Exception as e:
+            self.logger.log_file_only(
+                f"Ignoring unreadable deferred uploads {self.path} {e}",
+                LoggingLevel.Warn,
+            )
+
+        self.jobs = {
+            video_folder: deferred_at
+            for video_folder, deferred_at in self.jobs.items()
+            if os.path.isdir(os.path.join(output_directory, video_folder))
+        }
+
+    def pending(self) -> list[str]:
+        """Deferred jobs, the longest waiting first"""
+        with self.lock:
+            return sorted(self.jobs, key=self.jobs.get)
+
+    def add(self, video_folder: str):
+        with self.lock:
+            if video_folder in self.jobs:
+                return
+            self.jobs[video_folder] = datetime.datetime.now().isoformat()
+            self._save()
+
+    def remove(self, video_folder: str):
+        with self.lock:
+            if self.jobs.pop(video_folder, None) is not None:
+                self._save()
+
+    def _save(self):
+        try:
+            utils.save_json(self.path, self.jobs)
+        except Exception as e:
+            self.logger.log_file_only(
+                f"Failed to save deferred uploads {e}", LoggingLevel.Error
+            )
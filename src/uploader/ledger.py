@@ -0,0 +1,134 @@
+import datetime
+import hashlib
+import os
+import threading
+
+from src.logger import Logger, LoggingLevel
+import src.utils as utils
+
+
+class UploadLedger:
+    """Record of every video already published to the channel.
+
+    Uploads are keyed by the sha256 of the video file, so a renamed or
+    re-rendered but identical output is still recognized. Hashes are reused
+    while the file keeps its size and mtime, a rerun doesn't read gigabytes
+    again just to find out nothing changed. It's kept next to token.json
+    rather than in files/ so --clean doesn't forget what's on the channel.
+    """
+
+    def __init__(self, logger: Logger, path: str = "upload_ledger.json"):
+        self.logger = logger
+        self.path = path
+        self.lock = threading.Lock()
+        self.data: dict = {"uploads": {}, "hashes": {}}
+
+        try:
+            self.data = utils.load_json(self.path, self.data)
+        except Exception as e:
+            self.logger.log_file_with_stdout(
+                f"Upload ledger {self.path} is unreadable, starting a new one",
+                LoggingLevel.Warn,
+            )
+            self.logger.log_file_only(f"Ledger Error {e}", LoggingLevel.Warn)
+
+        self.data.setdefault("uploads", {})
+        self.data.setdefault("hashes", {})
+
+    def get(self, video_file: str) -> None | dict:
+        digest = self.hash_file(video_file)
+        with self.lock:
+            return self.data["uploads"].get(digest)
+
+    def get_by_source(self, source: str) -> None | dict:
+        """Upload of the job `source`, for streamed videos that have no file"""
+        with self.lock:
+            for entry in self.data["uploads"].values():
+                if entry.get("source") == source:
+                    return entry
+        return None
+
+    def record_upload(self, video_file: str, video_id: str, source: None | str = None):
+        self.record(
+            self.hash_file(video_file),
+            video_file,
+            os.path.getsize(video_file),
+            video_id,
+            source,
+        )
+
+    def record(
+        self,
+        digest: str,
+        path: None | str,
+        size: int,
+        video_id: str,
+        source: None | str = None,
+    ):
+        with self.lock:
+            self.data["uploads"][digest] = {
+                "path": path,
+                "size": size,
+                "source": source,
+                "video_id": video_id,
+                "thumbnail_uploaded": False,
+                "uploaded_at": datetime.datetime.now().isoformat(),
+            }
+            self._save()
+
+    def record_thumbnail(self, video_id: str):
+        with self.lock:
+            for entry in self.data["uploads"].values():
+                if entry["video_id"] == video_id:
+                    entry["thumbnail_uploaded"] = True
+            self._save()
+
+    def hash_file(self, path: str) -> str:
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+
+        with self.lock:
+            cached = self.data["hashes"].get(key)
+        if (
+            cached
+            and cached["size"] == stat.st_size
+            and cached["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return cached["sha256"]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(block)
+
+        with self.lock:
+            self.data["hashes"][key] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": digest.hexdigest(),
+            }
+            self._save()
+        return digest.hexdigest()
+
+    def _save(self):
+        try:
+            utils.save_json(self.path, self.data)
+        except Exception as e:
+            self.logger.log_file_only(
+                f"Failed to save upload ledger {e}", LoggingLevel.Error
+            )
+
+
+_ledger: None | UploadLedger = None
+_ledger_lock = threading.Lock()
+
+
+def get_upload_ledger(logger: Logger) -> UploadLedger:
+    """Returns the process wide ledger, every writer has to share one copy"""
+    global _ledger
+
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = UploadLedger(logger)
+
+        return _ledger
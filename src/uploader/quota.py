@@ -0,0 +1,138 @@
+import datetime
+import threading
+
+from src.config import ConfigLoader
+from src.logger import Logger, LoggingLevel
+import src.utils as utils
+
+# units charged by the YouTube Data API for each call
+QUOTA_COSTS = {
+    "videos.insert": 1600,
+    "thumbnails.set": 50,
+    "videos.list": 1,
+}
+
+try:
+    from zoneinfo import ZoneInfo
+
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except Exception:
+    # no tz database (Windows without tzdata), Pacific standard time is off
+    # by an hour during daylight saving at worst
+    QUOTA_TIMEZONE = datetime.timezone(datetime.timedelta(hours=-8))
+
+
+class QuotaExceededError(Exception):
+    """The API refused a call because today's quota is spent"""
+
+
+class QuotaTracker:
+    """Counts the API units spent today, persisted across runs.
+
+    The daily quota resets at midnight Pacific time, so usage is stored per
+    Pacific date. Calls are reserved before they're made, a caller that
+    can't reserve its units defers the work to the next window instead of
+    failing halfway through with quotaExceeded.
+    """
+
+    def __init__(
+        self, logger: Logger, daily_quota: int, path: str = "quota_usage.json"
+    ):
+        self.logger = logger
+        self.daily_quota = daily_quota
+        self.path = path
+        self.lock = threading.Lock()
+        self.usage: dict[str, dict[str, int]] = {}
+
+        try:
+            self.usage = utils.load_json(self.path, self.usage)
+        except Exception as e:
+            self.logger.log_file_only(
+                f"Ignoring unreadable quota usage {self.path} {e}", LoggingLevel.Warn
+            )
+
+    def today(self) -> str:
+        return datetime.datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+    def next_reset(self) -> datetime.datetime:
+        now = datetime.datetime.now(QUOTA_TIMEZONE)
+        return datetime.datetime.combine(
+            now.date() + datetime.timedelta(days=1), datetime.time(), QUOTA_TIMEZONE
+        )
+
+    def used(self) -> int:
+        with self.lock:
+            return sum(self.usage.get(self.today(), {}).values())
+
+    def remaining(self) -> int:
+        return max(self.daily_quota - self.used(), 0)
+
+    def reserve(self, calls: list[str]) -> bool:
+        """Charges the calls if all of them fit in what's left of today"""
+        cost = sum(QUOTA_COSTS[call] for call in calls)
+
+        with self.lock:
+            today = self.today()
+            # only today's window matters, older ones are dropped
+            self.usage = {today: self.usage.get(today, {})}
+            if sum(self.usage[today].values()) + cost > self.daily_quota:
+                return False
+
+            for call in calls:
+                self.usage[today][call] = (
+                    self.usage[today].get(call, 0) + QUOTA_COSTS[call]
+                )
+            self._save()
+
+        self.logger.log_file_only(
+            f"Reserved {cost} quota units for {calls}, {self.remaining()} left today",
+            LoggingLevel.Info,
+        )
+        return True
+
+    def record(self, call: str):
+        """Charges a call that's made whether it fits or not"""
+        with self.lock:
+            today = self.today()
+            self.usage = {today: self.usage.get(today, {})}
+            self.usage[today][call] = self.usage[today].get(call, 0) + QUOTA_COSTS[call]
+            self._save()
+
+    def mark_exhausted(self):
+        """The API refused a call, nothing more fits until the reset"""
+        with self.lock:
+            today = self.today()
+            day_usage = self.usage.setdefault(today, {})
+            spent = sum(
+                units for call, units in day_usage.items() if call != "exhausted"
+            )
+            day_usage["exhausted"] = max(self.daily_quota - spent, 0)
+            self._save()
+
+        self.logger.log_file_with_stdout(
+            f"YouTube API quota exhausted until {self.next_reset():%Y-%m-%d %H:%M %Z}",
+            LoggingLevel.Warn,
+        )
+
+    def _save(self):
+        try:
+            utils.save_json(self.path, self.usage)
+        except Exception as e:
+            self.logger.log_file_only(
+                f"Failed to save quota usage {e}", LoggingLevel.Error
+            )
+
+
+_tracker: None | QuotaTracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_quota_tracker(config_loader: ConfigLoader, logger: Logger) -> QuotaTracker:
+    """Returns the process wide tracker of the configured daily quota"""
+    global _tracker
+
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = QuotaTracker(logger, config_loader.get_daily_quota())
+
+        return _tracker
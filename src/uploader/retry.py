@@ -0,0 +1,58 @@
+import random
+import threading
+import time
+
+from googleapiclient.errors import HttpError
+import httplib2
+
+from src.logger import Logger, LoggingLevel
+
+RETRIABLE_STATUS_CODES = (500, 502, 503, 504)
+# socket errors and timeouts are OSErrors, httplib2 raises its own on top
+RETRIABLE_EXCEPTIONS = (httplib2.HttpLib2Error, OSError)
+
+
+class RetryPolicy:
+    """Decides which upload errors are worth retrying and how long to wait.
+
+    Waits grow exponentially with full jitter, so workers that failed
+    together don't retry together, and never exceed `max_delay`. Every retry
+    is counted in `retries` for the whole run.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        max_retries: int,
+        max_delay: float,
+        base_delay: float = 1,
+    ):
+        self.logger = logger
+        self.max_retries = max_retries
+        self.max_delay = max_delay
+        self.base_delay = base_delay
+        self.retries = 0
+        self.lock = threading.Lock()
+
+    def is_retriable(self, error: Exception) -> bool:
+        if isinstance(error, HttpError):
+            return error.resp.status in RETRIABLE_STATUS_CODES
+        return isinstance(error, RETRIABLE_EXCEPTIONS)
+
+    def should_retry(self, error: Exception, attempt: int) -> bool:
+        """Sleeps before the next attempt and returns True if there's one"""
+        if attempt >= self.max_retries or not self.is_retriable(error):
+            return False
+
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        with self.lock:
+            self.retries += 1
+
+        self.logger.log_file_with_stdout(
+            f"Retriable upload error, retrying in {delay:.1f} sec "
+            f"({attempt + 1}/{self.max_retries})",
+            LoggingLevel.Warn,
+        )
+        self.logger.log_file_only(f"Upload Error {error}", LoggingLevel.Warn)
+        time.sleep(delay)
+        return True
@@ -0,0 +1,73 @@
+import datetime
+import os
+import threading
+
+from src.logger import Logger, LoggingLevel
+import src.utils as utils
+
+
+class UploadSessionStore:
+    """Remembers the resumable session of every upload still in progress.
+
+    A session is keyed by the path of the video and only handed back while
+    the file still has the size and mtime it had when the session was
+    opened, a re-rendered file has to start a new upload.
+    """
+
+    def __init__(self, logger: Logger, path: str = "files/upload_sessions.json"):
+        self.logger = logger
+        self.path = path
+        self.lock = threading.Lock()
+        self.sessions: dict[str, dict] = {}
+
+        try:
+            self.sessions = utils.load_json(self.path, self.sessions)
+        except Exception as e:
+            self.logger.log_file_only(
+                f"Ignoring unreadable upload sessions {self.path} {e}",
+                LoggingLevel.Warn,
+            )
+
+    def get(self, video_file: str) -> None | dict:
+        key = os.path.abspath(video_file)
+        with self.lock:
+            session = self.sessions.get(key)
+        if session is None:
+            return None
+
+        stat = os.stat(video_file)
+        if session["size"] != stat.st_size or session["mtime_ns"] != stat.st_mtime_ns:
+            self.logger.log_file_only(
+                f"{video_file} changed since its upload started, starting over",
+                LoggingLevel.Info,
+            )
+            self.remove(video_file)
+            return None
+
+        return session
+
+    def save(self, video_file: str, resumable_uri: str, offset: int):
+        stat = os.stat(video_file)
+        with self.lock:
+            self.sessions[os.path.abspath(video_file)] = {
+                "path": video_file,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "resumable_uri": resumable_uri,
+                "offset": offset,
+                "updated_at": datetime.datetime.now().isoformat(),
+            }
+            self._save()
+
+    def remove(self, video_file: str):
+        with self.lock:
+            if self.sessions.pop(os.path.abspath(video_file), None) is not None:
+                self._save()
+
+    def _save(self):
+        try:
+            utils.save_json(self.path, self.sessions)
+        except Exception as e:
+            self.logger.log_file_only(
+                f"Failed to save upload sessions {e}", LoggingLevel.Error
+            )
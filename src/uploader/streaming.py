@@ -0,0 +1,103 @@
+from collections.abc import Iterable
+import hashlib
+import subprocess
+from typing import BinaryIO
+
+from googleapiclient.http import MediaUpload
+
+
+class PipeMediaUpload(MediaUpload):
+    """Resumable media read from the stdout of a running ffmpeg.
+
+    googleapiclient asks for the bytes of each chunk by offset, and after a
+    failure for the bytes from the offset the server acknowledged. Nothing
+    before the offset of the last request is needed again, so only the
+    current chunk is kept in memory no matter how long the video is. Every
+    byte read is hashed and optionally written to `tee` for archival.
+
+    The total size is only known once ffmpeg has exited. An exit with an
+    error raises instead of reporting the end of the stream, so a failed
+    render never gets published as a truncated video.
+    """
+
+    read_size = 1024 * 1024
+
+    def __init__(
+        self,
+        process: subprocess.Popen,
+        chunksize: int,
+        tee: None | BinaryIO = None,
+        stderr_tail: None | Iterable[str] = None,
+        mimetype: str = "video/mp4",
+    ):
+        self.process = process
+        self.stderr_tail = stderr_tail if stderr_tail is not None else []
+        self._chunksize = chunksize
+        self.tee = tee
+        self._mimetype = mimetype
+        self.buffer = bytearray()
+        # stream offset of buffer[0]
+        self.buffer_offset = 0
+        self.total_size: None | int = None
+        self.ended_on_chunk_boundary = False
+        self.sha256 = hashlib.sha256()
+
+    def chunksize(self) -> int:
+        # googleapiclient only sends the total size with a chunk shorter than
+        # chunksize(), a last chunk that's exactly chunk sized has to look
+        # short or the upload would never be finalized
+        if self.ended_on_chunk_boundary:
+            return self._chunksize + 1
+        return self._chunksize
+
+    def mimetype(self) -> str:
+        return self._mimetype
+
+    def size(self) -> None | int:
+        return self.total_size
+
+    def resumable(self) -> bool:
+        return True
+
+    def has_stream(self) -> bool:
+        return False
+
+    def getbytes(self, begin: int, length: int) -> bytes:
+        if begin < self.buffer_offset:
+            raise Exception(
+                f"Stream offset {begin} was already discarded, "
+                f"buffer starts at {self.buffer_offset}"
+            )
+
+        del self.buffer[: begin - self.buffer_offset]
+        self.buffer_offset = begin
+        self.ended_on_chunk_boundary = False
+
+        # one byte more than asked tells if this chunk is the last one
+        while self.total_size is None and len(self.buffer) <= length:
+            block = self.process.stdout.read(self.read_size)
+            if not block:
+                self.finish()
+                break
+
+            self.buffer += block
+            self.sha256.update(block)
+            if self.tee:
+                self.tee.write(block)
+
+        data = bytes(self.buffer[:length])
+        if self.total_size == begin + length:
+            self.ended_on_chunk_boundary = True
+        return data
+
+    def finish(self):
+        returncode = self.process.wait()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(
+                returncode, self.process.args, stderr="\n".join(self.stderr_tail)
+            )
+
+        self.total_size = self.buffer_offset + len(self.buffer)
+
+    def to_json(self):
+        raise NotImplementedError("a pipe can't be serialized")
@@ -1,9 +1,26 @@
-from src.config import ConfigLoader
-from src.logger import Logger, LoggingLevel
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.config import ConfigLoader, PublishMode, UploadPriority
+from src.logger import JobLogger, Logger, LoggingLevel
+from src.metadata import get_metadata_service
 import os
+import sys
 
+from src.processors.editor import VideoEditor
+from src.processors.ffmpeg_runner import open_ffmpeg_stream
+from src.uploader.deferred import DeferredUploads
+from src.uploader.ledger import get_upload_ledger
+from src.uploader.quota import QuotaExceededError, get_quota_tracker
+from src.uploader.streaming import PipeMediaUpload
+import src.utils as utils
 from src.uploader.youtube_uploader import YouTubeUploader
 
+force_upload_flag = "--force-upload"
+
+
+def is_force_upload_arg_passed() -> bool:
+    return force_upload_flag in sys.argv[1:]
+
 
 class Uploader:
     def __init__(
@@ -16,6 +33,13 @@ class Uploader:
         self.logger = logger
         self.youtube_uploader = youtube_uploader
         self.video_folders = self.list_elements_in_output_directory()
+        self.ledger = get_upload_ledger(logger)
+        self.force_upload = is_force_upload_arg_passed()
+        self.quota_tracker = get_quota_tracker(config_loader, logger)
+        self.deferred = DeferredUploads(logger, config_loader.get_output_directory())
+        self.stream_publish = config_loader.get_publish_mode() == PublishMode.STREAM
+        self.is_windows = utils.is_windows()
+        self.metadata_service = get_metadata_service(logger, config_loader)
 
     def list_elements_in_output_directory(self) -> list[str]:
         try:
@@ -33,7 +57,7 @@ class Uploader:
 
     def get_video_file(self, items: list[str]) -> str | None:
         for item in items:
-            if "mp4" in item:
+            if item.endswith(".mp4"):
                 return item
         return None
 
@@ -43,38 +67,258 @@ class Uploader:
                 return item
         return None
 
-    def start_uploading_to_youtube(self):
+    def get_scheduled_folders(self) -> list[str]:
+        """Video folders in the order of the configured upload priority"""
+        return sorted(self.video_folders, key=self.get_upload_sort_key)
+
+    def get_upload_sort_key(self, video_folder: str) -> float:
+        """Key ordering uploads by the configured priority, lowest goes first.
+
+        Whatever doesn't fit in today's quota is deferred to the next window,
+        so smallest first (the default) gets the most videos out per day.
+        """
+        priority = self.config_loader.get_upload_priority()
+        items_dir = os.path.join(
+            self.config_loader.get_output_directory(), video_folder
+        )
         try:
-            for video_folder in self.video_folders:
-                output_dir = self.config_loader.get_output_directory()
-                items_dir = os.path.join(output_dir, video_folder)
-                items = os.listdir(items_dir)
+            video_file = self.get_video_file(os.listdir(items_dir))
+            stat = os.stat(os.path.join(items_dir, video_file))
+        except Exception:
+            # nothing to upload yet (streamed) or at all, reported when its
+            # turn comes
+            return 0
 
-                video_file = self.get_video_file(items)
-                thumbnail_file = self.get_thumbnail_file(items)
+        if priority in (UploadPriority.SMALLEST, UploadPriority.LARGEST):
+            key = stat.st_size
+        else:
+            key = stat.st_mtime
+        return (
+            -key if priority in (UploadPriority.LARGEST, UploadPriority.NEWEST) else key
+        )
 
-                if not video_file:
+    def start_uploading_to_youtube(self):
+        video_folders = self.get_scheduled_folders()
+        workers = min(
+            self.config_loader.get_upload_workers(), max(len(video_folders), 1)
+        )
+        self.logger.log_file_with_stdout(
+            f"Uploading {len(video_folders)} videos with {workers} workers, "
+            f"{self.quota_tracker.remaining()} quota units left today",
+            LoggingLevel.Info,
+        )
+
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="upload"
+        ) as executor:
+            futures = {
+                executor.submit(self.upload_video_folder, video_folder): video_folder
+                for video_folder in video_folders
+            }
+
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
                     self.logger.log_file_with_stdout(
-                        f"No video found - Search at: {items_dir} Items: {items}",
+                        f"Error occured while uploading {futures[future]}",
                         LoggingLevel.Error,
                     )
-                    continue
-
-                uploaded_video_id = self.youtube_uploader.upload_video(
-                    video_file=f"{items_dir}/{video_file}",
-                    title=os.path.splitext(video_file)[0],
-                    tags=[""],
-                    description="Welcome to my youtube channel!!, Subscribe for trending songs daily!!",
-                    privacy_status="public",
-                )
-
-                if uploaded_video_id and thumbnail_file:
-                    self.youtube_uploader.upload_thumbnail(
-                        uploaded_video_id, f"{items_dir}/{thumbnail_file}"
-                    )
+                    self.logger.log_file_with_stdout(f"Error {e}", LoggingLevel.Error)
+
+        self.report_deferred()
 
-        except Exception as e:
+    def report_deferred(self):
+        deferred = self.deferred.pending()
+        if deferred:
             self.logger.log_file_with_stdout(
-                "Error occured at the ending", LoggingLevel.Error
+                f"Deferred {len(deferred)} videos to the next quota window "
+                f"({self.quota_tracker.next_reset():%Y-%m-%d %H:%M %Z}): {deferred}",
+                LoggingLevel.Warn,
             )
-            self.logger.log_file_with_stdout(f"Error {e}", LoggingLevel.Error)
+
+    def upload_video_folder(self, video_folder: str):
+        output_dir = self.config_loader.get_output_directory()
+        items_dir = os.path.join(output_dir, video_folder)
+        items = os.listdir(items_dir)
+
+        video_file = self.get_video_file(items)
+        thumbnail_file = self.get_thumbnail_file(items)
+        thumbnail_path = f"{items_dir}/{thumbnail_file}" if thumbnail_file else None
+
+        if not video_file and self.stream_publish:
+            self.publish_stream(video_folder, thumbnail_path)
+            return
+
+        if not video_file:
+            self.logger.log_file_with_stdout(
+                f"No video found - Search at: {items_dir} Items: {items}",
+                LoggingLevel.Error,
+            )
+            return
+
+        video_path = f"{items_dir}/{video_file}"
+        if self.is_published(self.ledger.get(video_path), video_file, thumbnail_path):
+            self.deferred.remove(video_folder)
+            return
+
+        if not self.reserve_quota(video_folder, video_file, thumbnail_path):
+            return
+
+        try:
+            uploaded_video_id = self.youtube_uploader.upload_video(
+                video_file=video_path,
+                title=os.path.splitext(video_file)[0],
+                tags=[""],
+                description="Welcome to my youtube channel!!, Subscribe for trending songs daily!!",
+                privacy_status="public",
+            )
+        except QuotaExceededError:
+            self.defer(video_folder, video_file)
+            return
+
+        if uploaded_video_id:
+            self.ledger.record_upload(video_path, uploaded_video_id, video_folder)
+            self.deferred.remove(video_folder)
+
+        if uploaded_video_id and thumbnail_path:
+            # reserved together with the video
+            self.upload_thumbnail(
+                uploaded_video_id, thumbnail_path, reserve_quota=False
+            )
+
+    def publish_stream(self, video_folder: str, thumbnail_path: None | str):
+        """Renders the edited job `video_folder` straight into its upload.
+
+        ffmpeg writes a fragmented mp4 to a pipe which is read chunk by chunk
+        as the upload asks for it, the full video never exists on disk unless
+        stream-tee keeps a copy in the output directory.
+        """
+        published = self.ledger.get_by_source(video_folder)
+        if self.is_published(published, video_folder, thumbnail_path):
+            self.deferred.remove(video_folder)
+            return
+
+        editor = VideoEditor(
+            link=f"https://youtu.be/{video_folder}",
+            logger=JobLogger(self.logger, video_folder),
+            configLoader=self.config_loader,
+            metadata_service=self.metadata_service,
+        )
+        filename, args, duration = editor.prepare_stream_render()
+
+        if not self.reserve_quota(video_folder, filename, thumbnail_path):
+            return
+
+        items_dir = os.path.join(
+            self.config_loader.get_output_directory(), video_folder
+        )
+        video_path = f"{items_dir}/{filename}.mp4"
+        tee_path = f"{video_path}.partial"
+        tee = open(tee_path, "wb") if self.config_loader.get_stream_tee() else None
+
+        self.logger.log_file_with_stdout(
+            f"Streaming {duration:.0f} s render of {video_folder} into its upload",
+            LoggingLevel.Info,
+        )
+        process, stderr_tail = open_ffmpeg_stream(args, self.is_windows)
+        media = PipeMediaUpload(
+            process,
+            chunksize=self.youtube_uploader.upload_speed,
+            tee=tee,
+            stderr_tail=stderr_tail,
+        )
+
+        try:
+            uploaded_video_id = self.youtube_uploader.upload_video(
+                video_file=video_path,
+                title=filename,
+                tags=[""],
+                description="Welcome to my youtube channel!!, Subscribe for trending songs daily!!",
+                privacy_status="public",
+                media=media,
+            )
+        except QuotaExceededError:
+            self.defer(video_folder, filename)
+            uploaded_video_id = None
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            if tee:
+                tee.close()
+
+        if not uploaded_video_id:
+            if tee:
+                os.remove(tee_path)
+            return
+
+        if tee:
+            os.replace(tee_path, video_path)
+        self.ledger.record(
+            media.sha256.hexdigest(),
+            video_path if tee else None,
+            media.size(),
+            uploaded_video_id,
+            video_folder,
+        )
+        self.deferred.remove(video_folder)
+
+        if thumbnail_path:
+            self.upload_thumbnail(
+                uploaded_video_id, thumbnail_path, reserve_quota=False
+            )
+
+    def is_published(
+        self, published: None | dict, name: str, thumbnail_path: None | str
+    ) -> bool:
+        if not published or self.force_upload:
+            return False
+
+        self.logger.log_file_with_stdout(
+            f"{name} is already published as {published['video_id']} "
+            f"on {published['uploaded_at']}. Skipping... "
+            f"(pass {force_upload_flag} to upload it again)",
+            LoggingLevel.Info,
+        )
+        if thumbnail_path and not published["thumbnail_uploaded"]:
+            self.upload_thumbnail(published["video_id"], thumbnail_path)
+        return True
+
+    def reserve_quota(
+        self, video_folder: str, name: str, thumbnail_path: None | str
+    ) -> bool:
+        calls = (
+            ["videos.insert", "thumbnails.set"] if thumbnail_path else ["videos.insert"]
+        )
+        if self.quota_tracker.reserve(calls):
+            return True
+
+        self.logger.log_file_with_stdout(
+            f"Not enough quota left today for {name}, deferring it",
+            LoggingLevel.Warn,
+        )
+        self.deferred.add(video_folder)
+        return False
+
+    def defer(self, video_folder: str, name: str):
+        """Keeps a job the API refused for lack of quota for the next window"""
+        self.logger.log_file_with_stdout(
+            f"YouTube refused {name}, the daily quota is spent, deferring it",
+            LoggingLevel.Warn,
+        )
+        self.deferred.add(video_folder)
+
+    def upload_thumbnail(
+        self, video_id: str, thumbnail_path: str, reserve_quota: bool = True
+    ):
+        if reserve_quota and not self.quota_tracker.reserve(["thumbnails.set"]):
+            self.logger.log_file_with_stdout(
+                f"Not enough quota left today for the thumbnail of {video_id}, "
+                "it's set on a later run",
+                LoggingLevel.Warn,
+            )
+            return
+
+        if self.youtube_uploader.upload_thumbnail(video_id, thumbnail_path):
+            self.ledger.record_thumbnail(video_id)
@@ -1,14 +1,73 @@
+import contextlib
+import json
 import os
+import threading
 from src.config import ConfigLoader
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
+import httplib2
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+from googleapiclient.http import MediaFileUpload, MediaUpload
 from googleapiclient.errors import HttpError
 from progress.bar import Bar
+from src.bandwidth import get_bandwidth_governor
+from src.http_client import get_http_client
+from src.uploader.chunking import AdaptiveChunkSizer
+from src.uploader.credentials import CredentialManager, LockedCredentials
+from src.uploader.quota import QuotaExceededError, get_quota_tracker
+from src.uploader.retry import RetryPolicy
+from src.uploader.session_store import UploadSessionStore
 from src.logger import Logger, LoggingLevel
 
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/youtube/v3/rest"
+
+_discovery_document: None | dict = None
+_discovery_lock = threading.Lock()
+
+
+def load_discovery_document(
+    config_loader: ConfigLoader,
+    logger: Logger,
+    cache_path: None | str = None,
+) -> dict:
+    """YouTube v3 discovery document, parsed once per process.
+
+    The copy bundled with google-api-python-client is used when there is
+    one, otherwise a copy cached on disk, and it's only fetched when neither
+    exists.
+    """
+    global _discovery_document
+    cache_path = (
+        cache_path
+        or f"{config_loader.get_scratch_directory()}/youtube_v3_discovery.json"
+    )
+
+    with _discovery_lock:
+        if _discovery_document is not None:
+            return _discovery_document
+
+        document = discovery_cache.get_static_doc("youtube", "v3")
+        if document is None and os.path.exists(cache_path):
+            with open(cache_path, "r") as cache_file:
+                document = cache_file.read()
+
+        if document is None:
+            logger.log_file_only(
+                f"Fetching discovery document {DISCOVERY_URL}", LoggingLevel.Info
+            )
+            response = get_http_client(config_loader).get(DISCOVERY_URL)
+            response.raise_for_status()
+            document = response.text
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "w") as cache_file:
+                cache_file.write(document)
+
+        _discovery_document = json.loads(document)
+        return _discovery_document
+
 
 class YouTubeUploader:
     def __init__(
@@ -24,7 +83,22 @@ class YouTubeUploader:
         self.token_file = token_file
         self.scopes = ["https://www.googleapis.com/auth/youtube.upload"]
         self.youtube = None
-        self.upload_speed = 5 * 1024 * 1024  # upload speed (size of each chunk)
+        self.credentials = None
+        self.credential_manager: None | CredentialManager = None
+        self.thread_state = threading.local()
+        # one bar per terminal, concurrent uploads report through the log
+        self.show_progress_bar = config_loader.get_upload_workers() == 1
+        self.upload_speed = config_loader.get_upload_chunk_size()  # first chunk
+        self.bandwidth_governor = get_bandwidth_governor(config_loader, logger)
+        self.session_store = UploadSessionStore(
+            logger, f"{config_loader.get_scratch_directory()}/upload_sessions.json"
+        )
+        self.quota_tracker = get_quota_tracker(config_loader, logger)
+        self.retry_policy = RetryPolicy(
+            logger,
+            max_retries=config_loader.get_upload_retries(),
+            max_delay=config_loader.get_upload_retry_max_delay(),
+        )
 
         if not os.path.exists(self.client_secrets_file):
             self.logger.log_file_with_stdout(
@@ -57,11 +131,61 @@ class YouTubeUploader:
                 token.write(creds.to_json())
 
         # Build YouTube API service
-        self.youtube = build("youtube", "v3", credentials=creds)
+        self.credentials = creds
+        if self.credential_manager is None:
+            self.credential_manager = CredentialManager(
+                self.logger, creds, self.token_file
+            )
+            self.credential_manager.start()
+        self.youtube = self.get_youtube()
         self.logger.log_file_with_stdout(
             "Successfully authenticated with YouTube API", LoggingLevel.Info
         )
 
+    def get_youtube(self):
+        """YouTube API client of the calling thread.
+
+        httplib2 connections aren't thread safe, so every upload worker
+        builds its own client over its own authorized transport. The
+        credentials are shared and kept valid by the credential manager, the
+        transports refresh them through it too.
+        """
+        if not self.credentials:
+            raise Exception("Not authenticated. Call authenticate() first.")
+
+        youtube = getattr(self.thread_state, "youtube", None)
+        if youtube is None:
+            http = AuthorizedHttp(
+                LockedCredentials(self.credential_manager),
+                http=httplib2.Http(timeout=self.config_loader.get_api_timeout()),
+            )
+            youtube = build_from_document(
+                load_discovery_document(self.config_loader, self.logger), http=http
+            )
+            self.thread_state.youtube = youtube
+
+        return youtube
+
+    def _resume_session(self, insert_request, video_file: str) -> int:
+        """Points the request at the stored session of the file, if there's one.
+
+        Flagging the request as errored makes its first next_chunk() ask the
+        server for the committed offset before sending anything, the upload
+        then carries on from there. Returns the offset stored locally.
+        """
+        session = self.session_store.get(video_file)
+        if session is None:
+            return 0
+
+        insert_request.resumable_uri = session["resumable_uri"]
+        insert_request._in_error_state = True
+        self.logger.log_file_with_stdout(
+            f"Resuming upload of {video_file} from "
+            f"{self._format_bytes(session['offset'])}",
+            LoggingLevel.Info,
+        )
+        return session["offset"]
+
     def _is_headless_environment(self):
         """Check if running in headless environment"""
         import shutil
@@ -105,16 +229,23 @@ class YouTubeUploader:
         tags=None,
         category_id="22",
         privacy_status="private",
+        media: None | MediaUpload = None,
     ):
-        """Upload video to YouTube with progress bar"""
-        if not self.youtube:
-            raise Exception("Not authenticated. Call authenticate() first.")
+        """Upload video to YouTube with progress bar.
+
+        `media` replaces reading `video_file` from disk, for videos whose
+        size is only known once they're complete (streamed renders). Raises
+        QuotaExceededError when the API refused it for lack of quota, other
+        failures return None.
+        """
+        youtube = self.get_youtube()
+        streaming = media is not None
 
-        if not os.path.exists(video_file):
+        if not streaming and not os.path.exists(video_file):
             raise FileNotFoundError(f"Video file not found: {video_file}")
 
         # Get file size for progress bar
-        file_size = os.path.getsize(video_file)
+        file_size = media.size() if streaming else os.path.getsize(video_file)
 
         tags = tags or []
 
@@ -128,36 +259,111 @@ class YouTubeUploader:
             "status": {"privacyStatus": privacy_status},
         }
 
-        # Create media upload object with 5mbps upload speed
-        media = MediaFileUpload(video_file, chunksize=self.upload_speed, resumable=True)
+        # chunks start at 5 MB and follow the measured throughput from there
+        chunk_sizer = AdaptiveChunkSizer(
+            self.logger,
+            initial_size=self.upload_speed,
+            max_size=self.config_loader.get_upload_chunk_max_size(),
+        )
+        if not streaming:
+            media = MediaFileUpload(
+                video_file, chunksize=chunk_sizer.chunk_size, resumable=True
+            )
 
         try:
             # Execute upload request
-            insert_request = self.youtube.videos().insert(
+            insert_request = youtube.videos().insert(
                 part=",".join(body.keys()), body=body, media_body=media
             )
+            # a stream can't be read again after a restart
+            resumed_offset = (
+                0 if streaming else self._resume_session(insert_request, video_file)
+            )
 
             response = None
 
             self.logger.log_file_with_stdout(
-                f"Starting upload of '{title}' ({self._format_bytes(file_size)})",
+                f"Starting upload of '{title}' "
+                f"({'streamed' if streaming else self._format_bytes(file_size)})",
                 LoggingLevel.Info,
             )
 
-            with Bar(
-                "Uploading", max=100, suffix="%(percent).1f%% - %(eta)ds"
-            ) as progress_bar:
+            if self.show_progress_bar and not streaming:
+                progress_context = Bar(
+                    "Uploading", max=100, suffix="%(percent).1f%% - %(eta)ds"
+                )
+            else:
+                progress_context = contextlib.nullcontext()
+
+            with progress_context as progress_bar:
                 previous_progress = 0
+                uploaded_bytes = resumed_offset
+                attempt = 0
                 while response is None:
-                    status, response = insert_request.next_chunk()
+                    # next_chunk() reads the chunk size of the media each call
+                    media._chunksize = chunk_sizer.chunk_size
+                    chunk_sizer.start_chunk()
+                    try:
+                        status, response = insert_request.next_chunk()
+                    except Exception as e:
+                        # sessions expire about a week after they're opened
+                        if (
+                            resumed_offset
+                            and isinstance(e, HttpError)
+                            and e.resp.status in (404, 410)
+                        ):
+                            self.logger.log_file_with_stdout(
+                                f"Upload session of '{title}' expired, starting over",
+                                LoggingLevel.Warn,
+                            )
+                            self.session_store.remove(video_file)
+                            insert_request = youtube.videos().insert(
+                                part=",".join(body.keys()), body=body, media_body=media
+                            )
+                            resumed_offset = uploaded_bytes = 0
+                            continue
+
+                        chunk_sizer.record_error()
+                        # a failed chunk leaves the request errored, the next
+                        # call asks the server which offset it acknowledged
+                        if not self.retry_policy.should_retry(e, attempt):
+                            raise
+                        attempt += 1
+                        continue
+
+                    attempt = 0
+
+                    sent_bytes = status.resumable_progress if status else media.size()
+                    chunk_sizer.record_chunk(sent_bytes - uploaded_bytes)
+
+                    # the chunk is already sent, waiting here delays the next
+                    # one so the average stays within the egress budget
+                    self.bandwidth_governor.consume_egress(sent_bytes - uploaded_bytes)
+                    uploaded_bytes = sent_bytes
 
                     if status is None:
                         break
 
+                    if streaming:
+                        self.logger.log_file_with_stdout(
+                            f"Uploading '{title}' {self._format_bytes(sent_bytes)} streamed",
+                            LoggingLevel.Info,
+                        )
+                        continue
+
+                    self.session_store.save(
+                        video_file, insert_request.resumable_uri, sent_bytes
+                    )
+
                     progress = int(status.progress() * 100)
                     current_progress = progress - previous_progress
 
-                    progress_bar.next(current_progress)
+                    if progress_bar:
+                        progress_bar.next(current_progress)
+                    elif progress // 10 > previous_progress // 10:
+                        self.logger.log_file_with_stdout(
+                            f"Uploading '{title}' {progress}%", LoggingLevel.Info
+                        )
                     self.logger.log_file_only(
                         f"Upload progress: {progress}, bar progress: {current_progress}, prev progresss: {previous_progress}, progress: {status.progress()}, Response : {response}",
                         LoggingLevel.Info,
@@ -165,7 +371,8 @@ class YouTubeUploader:
 
                     previous_progress = progress
 
-                progress_bar.finish()
+                if progress_bar:
+                    progress_bar.finish()
 
             if response == None:
                 self.logger.log_file_with_stdout(
@@ -174,11 +381,20 @@ class YouTubeUploader:
                 )
                 return None
 
+            if not streaming:
+                self.session_store.remove(video_file)
+
             self.logger.log_file_only(f"Response object: {response}", LoggingLevel.Info)
             self.logger.log_file_with_stdout(
                 f"Video '{title}' uploaded successfully. Video ID: {response['id']}",
                 LoggingLevel.Info,
             )
+            self.logger.log_file_with_stdout(
+                f"Uploaded {self._format_bytes(media.size())} at "
+                f"{chunk_sizer.effective_speed() / 1024 / 1024:.2f} MB/s, "
+                f"{self.retry_policy.retries} retries so far",
+                LoggingLevel.Info,
+            )
             self.logger.log_file_with_stdout(
                 f"URL: https://www.youtube.com/watch?v={response['id']}",
                 LoggingLevel.Info,
@@ -193,6 +409,10 @@ class YouTubeUploader:
             self.logger.log_file_only(
                 f"HTTP error {e.resp.status}: {e.content}", LoggingLevel.Error
             )
+            if self.is_quota_exceeded(e):
+                self.quota_tracker.mark_exhausted()
+                # the caller defers the video instead of dropping it
+                raise QuotaExceededError(title) from e
 
             return None
 
@@ -204,51 +424,9 @@ class YouTubeUploader:
 
             return None
 
-    # def _resumable_upload_with_progress(self, insert_request, total_size):
-    #     """Handle resumable upload with tqdm progress bar"""
-    #     response = None
-    #     error = None
-
-    #     try:
-    #         while response is None:
-    #             try:
-    #                 status, response = insert_request.next_chunk()
-    #                 if status:
-    #                     # Update progress bar
-    #                     current_progress = int(status.resumable_progress)
-    #                     progress_increment = current_progress - last_progress
-    #                     self.logger.log_file_only(f'Upload progress {progress_increment}', LoggingLevel.Info)
-    #                     last_progress = current_progress
-
-    #             except HttpError as e:
-    #                 if e.resp.status in [500, 502, 503, 504]:
-    #                     error = f"Retriable HTTP error {e.resp.status}: {e.content}"
-    #                     self.logger.log_file_only(f'Error while uploading file check your connection !', LoggingLevel.Error)
-    #                     self.logger.log_file_only(f'Upload Error :{error}', LoggingLevel.Error)
-    #                 else:
-    #                     raise
-    #             except Exception as e:
-    #                 error = f"Retriable error: {e}"
-
-    #             if error is not None:
-    #                 retry += 1
-    #                 if retry > 3:
-    #                     raise Exception("Maximum retry attempts exceeded")
-
-    #                 # Exponential backoff
-    #                 wait_time = 2 ** retry
-    #                 time.sleep(wait_time)
-    #                 error = None
-
-    #     except Exception as e:
-    #         self.logger.log_file_only(f'Error while uploading file check your connection !', LoggingLevel.Error)
-    #         self.logger.log_file_only(f'Upload Error :{e}', LoggingLevel.Error)
-
-    #     return response
-
     def upload_thumbnail(self, video_id, thumbnail_path):
         """Upload thumbnail for a video."""
-        if not self.youtube:
+        if not self.credentials:
             self.logger.log_file_with_stdout(
                 f"authenticate your channel.", LoggingLevel.Fatal
             )
@@ -259,16 +437,23 @@ class YouTubeUploader:
                 f"Uploading thumbnail: {os.path.basename(thumbnail_path)}",
                 LoggingLevel.Info,
             )
-            self.youtube.thumbnails().set(
+            self.get_youtube().thumbnails().set(
                 videoId=video_id, media_body=MediaFileUpload(thumbnail_path)
             ).execute()
             self.logger.log_file_with_stdout(
                 "Thumbnail uploaded successfully!", LoggingLevel.Error
             )
+            return True
         except Exception as e:
             self.logger.log_file_with_stdout(
                 f"Error uploading thumbnail: {e}", LoggingLevel.Error
             )
+            if isinstance(e, HttpError) and self.is_quota_exceeded(e):
+                self.quota_tracker.mark_exhausted()
+            return False
+
+    def is_quota_exceeded(self, error: HttpError) -> bool:
+        return error.resp.status == 403 and b"quotaExceeded" in (error.content or b"")
 
     def _format_bytes(self, bytes_size):
         """Format bytes to human readable format"""
@@ -1,5 +1,6 @@
 import re
 import os
+import json
 import platform
 import urllib.parse as url_parser
 
@@ -16,6 +17,12 @@ def generate_output_filename(yt_title: str) -> str:
         return f"{sanitized_title} {suffix}"
 
 
+def extract_video_id(url: str) -> None | str:
+    regex = r"(?:youtu\.be\/|youtube\.com\/(?:.*v=|.*\/|.*embed\/|v\/|shorts\/))([\w-]{11})"
+    match = re.search(regex, url)
+    return match.group(1) if match else None
+
+
 def is_windows() -> bool:
     return platform.system() == "Windows"
 
@@ -60,6 +67,28 @@ def format_bytes(size_bytes):
     return f"{size_bytes:.2f} {units[power]}"
 
 
+def load_json(path: str, default):
+    """Contents of the JSON state file at `path`, `default` until it's written.
+
+    An unreadable file raises, the caller decides whether to start over.
+    """
+    try:
+        with open(path, "r") as json_file:
+            return json.load(json_file)
+    except FileNotFoundError:
+        return default
+
+
+def save_json(path: str, data, indent: None | int = 2):
+    """Writes `data` to `path` through a temporary file and a rename, an
+    interrupted write never leaves a truncated state file behind"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.partial"
+    with open(temp_path, "w") as json_file:
+        json.dump(data, json_file, indent=indent)
+    os.replace(temp_path, path)
+
+
 def print_title():
     print("""
 
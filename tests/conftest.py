@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from src.config import ConfigLoader
+from src.logger import Logger
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Empty working directory with a minimal config.json, like a fresh install"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("sys.argv", ["main.py"])
+    # a fresh process, the shared metadata service reads this directory
+    monkeypatch.setattr("src.metadata._service", None)
+    (tmp_path / "sample.mp4").write_bytes(b"asset")
+    (tmp_path / "links.txt").write_text("")
+    (tmp_path / "config.json").write_text(
+        json.dumps(
+            {
+                "youtube-api-key": "test-key",
+                "asset-video-path": "sample.mp4",
+                "output-directory": "output",
+                "links-file-path": "links.txt",
+            }
+        )
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def logger(workdir):
+    return Logger()
+
+
+@pytest.fixture
+def config_loader(workdir, logger):
+    return ConfigLoader(logger)
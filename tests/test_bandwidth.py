@@ -0,0 +1,70 @@
+import pytest
+
+from src.bandwidth import TokenBucket
+
+
+class FakeClock:
+    """monotonic() and sleep() of the bucket, sleeping moves the clock"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("src.bandwidth.time.monotonic", clock.monotonic)
+    monkeypatch.setattr("src.bandwidth.time.sleep", clock.sleep)
+    return clock
+
+
+def test_bursts_within_a_second_pass_untouched(clock):
+    bucket = TokenBucket(rate=1000)
+
+    bucket.consume(600)
+    bucket.consume(400)
+
+    assert clock.sleeps == []
+    assert bucket.transferred == 1000
+
+
+def test_sustained_transfers_are_paced(clock):
+    bucket = TokenBucket(rate=1000)
+
+    bucket.consume(1000)
+    # the bucket is empty, a chunk larger than it waits for its debt
+    bucket.consume(2500)
+
+    assert clock.sleeps == [2.5]
+    assert bucket.transferred == 3500
+
+
+def test_bucket_refills_up_to_one_second(clock):
+    bucket = TokenBucket(rate=1000)
+    bucket.consume(1000)
+
+    clock.now += 0.5
+    bucket.consume(500)
+    assert clock.sleeps == []
+
+    # idle for long, still only one second worth of burst
+    clock.now += 60
+    bucket.consume(1500)
+    assert clock.sleeps == [0.5]
+
+
+def test_zero_rate_is_unlimited(clock):
+    bucket = TokenBucket(rate=0)
+
+    bucket.consume(10**9)
+
+    assert clock.sleeps == []
+    assert bucket.transferred == 10**9
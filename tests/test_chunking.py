@@ -0,0 +1,64 @@
+import pytest
+
+from src.uploader.chunking import CHUNK_GRANULARITY, AdaptiveChunkSizer
+
+MiB = 1024 * 1024
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("src.uploader.chunking.time.monotonic", clock.monotonic)
+    return clock
+
+
+def send_chunk(sizer: AdaptiveChunkSizer, clock: FakeClock, seconds: float) -> int:
+    size = sizer.chunk_size
+    sizer.start_chunk()
+    clock.now += seconds
+    sizer.record_chunk(size)
+    return sizer.chunk_size
+
+
+def test_fast_chunks_at_most_double_the_size(logger, clock):
+    sizer = AdaptiveChunkSizer(logger, initial_size=5 * MiB, target_seconds=8)
+
+    # 5 MB in 0.1 s would ask for 400 MB chunks
+    assert send_chunk(sizer, clock, 0.1) == 10 * MiB
+    assert send_chunk(sizer, clock, 0.1) == 20 * MiB
+
+
+def test_chunks_follow_the_measured_speed(logger, clock):
+    sizer = AdaptiveChunkSizer(logger, initial_size=16 * MiB, target_seconds=8)
+
+    # 1 MB/s, 8 MB take the target 8 s
+    assert send_chunk(sizer, clock, 16) == 8 * MiB
+    assert sizer.effective_speed() == MiB
+
+
+def test_errors_halve_the_size_down_to_the_minimum(logger):
+    sizer = AdaptiveChunkSizer(logger, initial_size=4 * MiB, min_size=MiB)
+
+    sizer.record_error()
+    assert sizer.chunk_size == 2 * MiB
+    sizer.record_error()
+    sizer.record_error()
+    assert sizer.chunk_size == MiB
+
+
+def test_sizes_are_rounded_and_clamped(logger, clock):
+    sizer = AdaptiveChunkSizer(logger, initial_size=MiB + 1000, max_size=2 * MiB)
+    assert sizer.chunk_size % CHUNK_GRANULARITY == 0
+    assert sizer.chunk_size == MiB
+
+    send_chunk(sizer, clock, 0.001)
+    send_chunk(sizer, clock, 0.001)
+    assert sizer.chunk_size == 2 * MiB
@@ -0,0 +1,44 @@
+from src.config import ConfigLoader, ConfigParams
+from src.logger import LoggingLevel
+
+
+def load_config(logger, monkeypatch) -> tuple[ConfigLoader, list[str]]:
+    warnings: list[str] = []
+    log = logger.log_file_with_stdout
+
+    def record(message: str, level: LoggingLevel):
+        if level == LoggingLevel.Warn:
+            warnings.append(message)
+        log(message, level)
+
+    monkeypatch.setattr(logger, "log_file_with_stdout", record)
+    return ConfigLoader(logger), warnings
+
+
+def test_zero_overrides_are_kept(logger, monkeypatch):
+    monkeypatch.setattr(
+        "sys.argv",
+        ["main.py", "--set", "download-retries=0", "--set=encoder-threads=0"],
+    )
+    monkeypatch.setenv("MOZART_UPLOAD_RETRIES", "0")
+
+    config_loader, warnings = load_config(logger, monkeypatch)
+
+    assert config_loader.get_download_retries() == 0
+    assert config_loader.get_upload_retries() == 0
+    assert config_loader.get_encoder_threads() == 0
+    assert warnings == []
+
+
+def test_rejected_override_falls_back_with_a_warning(logger, monkeypatch):
+    monkeypatch.setattr("sys.argv", ["main.py", "--set", "download-workers=0"])
+    monkeypatch.setenv("MOZART_UPLOAD_RETRIES", "many")
+    monkeypatch.setenv("MOZART_DAILY_QUOTA", "")
+
+    config_loader, warnings = load_config(logger, monkeypatch)
+
+    assert config_loader.get_upload_retries() == 10
+    assert config_loader.sources[ConfigParams.UPLOAD_RETRIES] == "default"
+    assert config_loader.get_daily_quota() == 10000
+    assert config_loader.get_download_workers() == 1
+    assert len(warnings) == 3
@@ -0,0 +1,105 @@
+import pytest
+
+from src.processors.downloader import VideoDownloader
+
+
+class FakeYoutubeDL:
+    """Writes `final_size` bytes as yt-dlp would after its postprocessors,
+    reporting `transferred` bytes downloaded to the progress hook"""
+
+    def __init__(self, downloader, path, remote_size, transferred, final_size):
+        self.downloader = downloader
+        self.path = path
+        self.remote_size = remote_size
+        self.transferred = transferred
+        self.final_size = final_size
+        self.calls = 0
+
+    def extract_info(self, video_id, download):
+        self.calls += 1
+        self.downloader.report_progress(
+            {
+                "status": "finished",
+                "filename": str(self.path),
+                "downloaded_bytes": self.transferred,
+                "total_bytes": self.transferred,
+                "info_dict": {"id": video_id},
+            }
+        )
+        self.path.write_bytes(b"\0" * self.final_size)
+        return {
+            "id": video_id,
+            "filesize": self.remote_size,
+            "requested_downloads": [{"filepath": str(self.path)}],
+        }
+
+
+@pytest.fixture
+def downloader(config_loader, logger, monkeypatch):
+    downloader = VideoDownloader(logger=logger, configLoader=config_loader)
+    monkeypatch.setattr(downloader, "is_valid_media", lambda path: True)
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    return downloader
+
+
+def test_fixed_up_m4a_is_accepted(downloader, workdir, monkeypatch):
+    # the m4a fixup remuxes the download, the file ends up smaller than the
+    # remote size although every byte was transferred
+    youtube_dl = FakeYoutubeDL(
+        downloader,
+        workdir / "audio_source.download.m4a",
+        remote_size=1000,
+        transferred=1000,
+        final_size=960,
+    )
+    monkeypatch.setattr(downloader, "get_youtube_dl", lambda: youtube_dl)
+
+    info, path = downloader.download_with_retries("abcdefghijk")
+
+    assert path == str(workdir / "audio_source.download.m4a")
+    assert youtube_dl.calls == 1
+
+
+def test_short_transfer_is_retried(downloader, workdir, monkeypatch):
+    youtube_dl = FakeYoutubeDL(
+        downloader,
+        workdir / "input.download.webm",
+        remote_size=1000,
+        transferred=400,
+        final_size=400,
+    )
+    monkeypatch.setattr(downloader, "get_youtube_dl", lambda: youtube_dl)
+
+    with pytest.raises(Exception, match="got 400 of 1000 bytes"):
+        downloader.download_with_retries("abcdefghijk")
+
+    assert youtube_dl.calls == downloader.config_loader.get_download_retries() + 1
+
+
+@pytest.fixture
+def fresh_ledger(monkeypatch):
+    monkeypatch.setattr("src.uploader.ledger._ledger", None)
+
+
+def test_only_published_jobs_are_finished(fresh_ledger, config_loader, logger, workdir):
+    for video_id in ("publishedvi", "renderedvid"):
+        (workdir / "output" / video_id).mkdir(parents=True)
+        (workdir / "output" / video_id / f"{video_id}.mp4").write_bytes(
+            video_id.encode()
+        )
+    (workdir / "links.txt").write_text(
+        "https://youtu.be/publishedvi\n"
+        "https://youtu.be/renderedvid\n"
+        "https://youtu.be/newvideo123\n"
+    )
+
+    downloader = VideoDownloader(logger=logger, configLoader=config_loader)
+    downloader.ledger.record_upload(
+        "output/publishedvi/publishedvi.mp4", "yt1", "publishedvi"
+    )
+
+    links = list(downloader.get_video_links())
+
+    assert links == ["https://youtu.be/renderedvid", "https://youtu.be/newvideo123"]
+    assert downloader.is_job_rendered("renderedvid")
+    assert not downloader.is_job_rendered("newvideo123")
@@ -0,0 +1,32 @@
+import subprocess
+
+from src.processors.editor import VideoEditor
+
+
+class FakeMetadataService:
+    def get_title(self, video_id):
+        return "Song"
+
+
+def test_failed_single_pass_render_falls_back(
+    config_loader, logger, workdir, monkeypatch
+):
+    def failing_ffmpeg(args, **kwargs):
+        with open(args[-1], "wb") as partial:
+            partial.write(b"truncated")
+        raise subprocess.CalledProcessError(1, args, stderr="broken pipe")
+
+    monkeypatch.setattr("src.processors.editor.run_ffmpeg", failing_ffmpeg)
+    editor = VideoEditor(
+        link="https://youtu.be/singlepass1",
+        logger=logger,
+        configLoader=config_loader,
+        metadata_service=FakeMetadataService(),
+    )
+    monkeypatch.setattr(editor, "get_audio_codec", lambda path: "aac")
+    (workdir / "files" / "singlepass1").mkdir(parents=True, exist_ok=True)
+
+    assert editor.render_single_pass() is False
+    assert not editor.failed
+    assert editor.manifest.data["artifacts"] == {}
+    assert list((workdir / "output" / "singlepass1").glob("*.mp4")) == []
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from src.processors.manifest import StageManifest
+
+
+@pytest.fixture
+def job(workdir):
+    job_directory = workdir / "files" / "manifestvid"
+    job_directory.mkdir(parents=True)
+    (job_directory / "input.webm").write_bytes(b"source video")
+    return job_directory
+
+
+def render(manifest: StageManifest, job, params: dict) -> tuple[str, dict]:
+    """Runs a stage the way the editor does, writing to the temporary path"""
+    artifact = str(job / "output.mp4")
+    description = manifest.describe([str(job / "input.webm")], params)
+    manifest.discard_partial(artifact)
+    with open(manifest.temp_path(artifact), "wb") as output:
+        output.write(b"rendered video")
+    manifest.commit(artifact, description)
+    return artifact, description
+
+
+def test_rerun_reuses_the_committed_artifact(job, logger):
+    artifact, description = render(StageManifest(str(job), "ffmpeg 7", logger), job, {})
+
+    rerun = StageManifest(str(job), "ffmpeg 7", logger)
+    assert rerun.is_fresh(artifact, rerun.describe([str(job / "input.webm")], {}))
+    assert rerun.is_complete(artifact)
+    assert not os.path.exists(rerun.temp_path(artifact))
+
+
+@pytest.mark.parametrize(
+    "change",
+    ["input", "params", "tool", "truncated"],
+)
+def test_changed_dependencies_rebuild_the_artifact(job, logger, change):
+    artifact, _ = render(StageManifest(str(job), "ffmpeg 7", logger), job, {"crf": 23})
+
+    params = {"crf": 23}
+    tool_version = "ffmpeg 7"
+    if change == "input":
+        (job / "input.webm").write_bytes(b"another source video")
+    elif change == "params":
+        params = {"crf": 18}
+    elif change == "tool":
+        tool_version = "ffmpeg 8"
+    else:
+        with open(artifact, "r+b") as output:
+            output.truncate(4)
+
+    rerun = StageManifest(str(job), tool_version, logger)
+    assert not rerun.is_fresh(
+        artifact, rerun.describe([str(job / "input.webm")], params)
+    )
+
+
+def test_partial_output_is_never_complete(job, logger):
+    manifest = StageManifest(str(job), "ffmpeg 7", logger)
+    artifact = str(job / "output.mp4")
+    # an interrupted run left its temporary output behind
+    with open(manifest.temp_path(artifact), "wb") as output:
+        output.write(b"half a vid")
+
+    assert not manifest.is_complete(artifact)
+    manifest.discard_partial(artifact)
+    assert not os.path.exists(manifest.temp_path(artifact))
+    assert not os.path.exists(artifact)
@@ -0,0 +1,74 @@
+import socket
+
+from googleapiclient.errors import HttpError
+import httplib2
+import pytest
+
+from src.uploader.retry import RetryPolicy
+
+
+def http_error(status: int, content: bytes = b"") -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), content)
+
+
+@pytest.fixture
+def policy(logger, monkeypatch):
+    monkeypatch.setattr("src.uploader.retry.time.sleep", lambda seconds: None)
+    return RetryPolicy(logger, max_retries=3, max_delay=4)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        http_error(500),
+        http_error(503),
+        socket.timeout("timed out"),
+        ConnectionResetError("reset by peer"),
+        httplib2.ServerNotFoundError("no dns"),
+    ],
+)
+def test_server_and_network_errors_are_retried(policy, error):
+    assert policy.is_retriable(error)
+    assert policy.should_retry(error, attempt=0)
+    assert policy.retries == 1
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        http_error(400),
+        http_error(401),
+        http_error(403, b"quotaExceeded"),
+        ValueError("bad metadata"),
+    ],
+)
+def test_client_errors_are_not_retried(policy, error):
+    assert not policy.should_retry(error, attempt=0)
+    assert policy.retries == 0
+
+
+def test_retries_stop_at_the_limit(policy):
+    assert policy.should_retry(http_error(502), attempt=2)
+    assert not policy.should_retry(http_error(502), attempt=3)
+
+
+def test_waits_grow_exponentially(policy, monkeypatch):
+    delays: list[float] = []
+    monkeypatch.setattr("src.uploader.retry.time.sleep", delays.append)
+    monkeypatch.setattr("src.uploader.retry.random.uniform", lambda low, high: high)
+
+    for attempt in range(3):
+        policy.should_retry(http_error(500), attempt)
+
+    assert delays == [1, 2, 4]
+
+
+def test_long_waits_are_capped(logger, monkeypatch):
+    delays: list[float] = []
+    monkeypatch.setattr("src.uploader.retry.time.sleep", delays.append)
+    monkeypatch.setattr("src.uploader.retry.random.uniform", lambda low, high: high)
+    policy = RetryPolicy(logger, max_retries=10, max_delay=4)
+
+    policy.should_retry(http_error(500), attempt=6)
+
+    assert delays == [4]
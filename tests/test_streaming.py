@@ -0,0 +1,101 @@
+import hashlib
+import io
+import json
+import subprocess
+import sys
+
+from googleapiclient.http import HttpRequest
+import httplib2
+import pytest
+
+from src.uploader.streaming import PipeMediaUpload
+
+CHUNK_SIZE = 1000
+
+
+class FakeUploadServer:
+    """Accepts a resumable upload and records the Content-Range of every chunk"""
+
+    session_uri = "https://upload.test/session"
+
+    def __init__(self):
+        self.content_ranges: list[str] = []
+        self.received = bytearray()
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        if uri != self.session_uri:
+            return (
+                httplib2.Response({"status": "200", "location": self.session_uri}),
+                b"",
+            )
+
+        self.content_ranges.append(headers["Content-Range"])
+        self.received += body
+        if headers["Content-Range"].endswith("/*"):
+            # size still unknown, ask for the next chunk
+            response = {"status": "308", "range": f"bytes=0-{len(self.received) - 1}"}
+            return httplib2.Response(response), b""
+        return httplib2.Response({"status": "200"}), b'{"id": "yt-1"}'
+
+
+def start_render(size: int, returncode: int = 0) -> subprocess.Popen:
+    """Stands in for ffmpeg, writes `size` bytes to stdout and exits"""
+    script = (
+        f"import sys; sys.stdout.buffer.write(b'v' * {size}); "
+        f"sys.stdout.flush(); sys.exit({returncode})"
+    )
+    return subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE)
+
+
+def upload(media: PipeMediaUpload, server: FakeUploadServer) -> dict:
+    request = HttpRequest(
+        server,
+        lambda response, content: json.loads(content),
+        "https://upload.test/start",
+        method="POST",
+        body="{}",
+        headers={"content-type": "application/json"},
+        resumable=media,
+    )
+    response = None
+    while response is None:
+        _, response = request.next_chunk()
+    return response
+
+
+@pytest.mark.parametrize("size", [2 * CHUNK_SIZE + 500, 3 * CHUNK_SIZE])
+def test_stream_is_finalized_with_its_size(size):
+    server = FakeUploadServer()
+    tee = io.BytesIO()
+    media = PipeMediaUpload(start_render(size), chunksize=CHUNK_SIZE, tee=tee)
+
+    assert upload(media, server) == {"id": "yt-1"}
+    # the last chunk of data announces the total, on a chunk boundary too,
+    # instead of an empty chunk with an inverted range after it
+    chunks = -(-size // CHUNK_SIZE)
+    assert len(server.content_ranges) == chunks
+    assert server.content_ranges[-1] == (
+        f"bytes {(chunks - 1) * CHUNK_SIZE}-{size - 1}/{size}"
+    )
+    assert all(
+        content_range.endswith("/*") for content_range in server.content_ranges[:-1]
+    )
+    assert bytes(server.received) == b"v" * size
+    assert media.size() == size
+    assert media.sha256.hexdigest() == hashlib.sha256(b"v" * size).hexdigest()
+    assert tee.getvalue() == b"v" * size
+
+
+def test_failed_render_is_never_finalized():
+    server = FakeUploadServer()
+    media = PipeMediaUpload(
+        start_render(2 * CHUNK_SIZE + 500, returncode=1),
+        chunksize=CHUNK_SIZE,
+        stderr_tail=["Conversion failed!"],
+    )
+
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        upload(media, server)
+
+    assert error.value.stderr == "Conversion failed!"
+    assert all(content_range.endswith("/*") for content_range in server.content_ranges)
@@ -0,0 +1,112 @@
+import os
+import sys
+
+import pytest
+
+from src.toolchain import Toolchain, parse_ffmpeg_list
+
+# trimmed output of ffmpeg 6/7, the mp4,m4a line stands in for entries
+# naming several formats at once
+MUXERS_OUTPUT = """File formats:
+ D. = Demuxing supported
+ .E = Muxing supported
+ --
+  E 3g2             3GP2 (3GPP2 file format)
+  E adts            ADTS AAC (Advanced Audio Coding)
+  E matroska        Matroska
+  E mp4             MP4 (MPEG-4 Part 14)
+  E mp4,m4a         MP4 / M4A
+  E null            raw null video
+"""
+
+ENCODERS_OUTPUT = """Encoders:
+ V..... = Video
+ A..... = Audio
+ S..... = Subtitle
+ .F.... = Frame-level multithreading
+ ..S... = Slice-level multithreading
+ ...X.. = Codec is experimental
+ ....B. = Supports draw_horiz_band
+ .....D = Supports direct rendering method 1
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10 (codec h264)
+ A....D aac                  AAC (Advanced Audio Coding)
+ A....D libopus              libopus Opus (codec opus)
+"""
+
+
+def test_muxers_are_parsed():
+    assert parse_ffmpeg_list(MUXERS_OUTPUT) == [
+        "3g2",
+        "adts",
+        "m4a",
+        "matroska",
+        "mp4",
+        "null",
+    ]
+
+
+def test_encoders_are_parsed():
+    # the legend above the dashes isn't a list of encoders
+    assert parse_ffmpeg_list(ENCODERS_OUTPUT) == ["aac", "libopus", "libx264"]
+
+
+FAKE_FFMPEG = """
+import os
+import sys
+
+directory = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(directory, "runs.txt"), "a") as runs:
+    runs.write(" ".join(sys.argv[1:]) + "\\n")
+
+if "-version" in sys.argv:
+    print("ffmpeg version 7.0 Copyright (c) 2000-2024")
+else:
+    name = "muxers" if "-muxers" in sys.argv else "encoders"
+    with open(os.path.join(directory, f"{name}.txt")) as output:
+        print(output.read())
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(workdir):
+    """An ffmpeg printing the outputs above, counting how often it runs"""
+    (workdir / "muxers.txt").write_text(MUXERS_OUTPUT)
+    (workdir / "encoders.txt").write_text(ENCODERS_OUTPUT)
+    script = workdir / "ffmpeg"
+    script.write_text(f"#!{sys.executable}{FAKE_FFMPEG}")
+    script.chmod(0o755)
+    return script
+
+
+def probe(logger, fake_ffmpeg, workdir) -> Toolchain:
+    toolchain = Toolchain(
+        logger,
+        {"ffmpeg": str(fake_ffmpeg)},
+        is_windows=False,
+        cache_path=str(workdir / "files" / "toolchain_cache.json"),
+    )
+    assert toolchain.version("ffmpeg") == "ffmpeg version 7.0 Copyright (c) 2000-2024"
+    assert toolchain.has_muxer("mp4")
+    assert toolchain.preferred_encoder(("libfdk_aac", "aac")) == "aac"
+    return toolchain
+
+
+def count_runs(workdir) -> int:
+    runs = workdir / "runs.txt"
+    return len(runs.read_text().splitlines()) if runs.exists() else 0
+
+
+def test_probes_are_cached_until_the_binary_changes(logger, fake_ffmpeg, workdir):
+    probe(logger, fake_ffmpeg, workdir)
+    assert count_runs(workdir) == 3
+
+    # the next run of the program spawns nothing
+    probe(logger, fake_ffmpeg, workdir)
+    assert count_runs(workdir) == 3
+
+    # an upgraded binary is probed again
+    stat = os.stat(fake_ffmpeg)
+    os.utime(fake_ffmpeg, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    probe(logger, fake_ffmpeg, workdir)
+    assert count_runs(workdir) == 6
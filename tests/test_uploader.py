@@ -0,0 +1,173 @@
+import json
+import threading
+import time
+
+import pytest
+
+from src.pipeline import _STOP, Pipeline, UploadQueue
+from src.processors.downloader import VideoDownloader
+from src.uploader.credentials import CredentialManager, LockedCredentials
+from src.uploader.quota import QuotaExceededError, QuotaTracker
+from src.uploader.uploader import Uploader
+
+
+class FakeYouTubeUploader:
+    upload_speed = 1024 * 1024
+
+    def __init__(self):
+        self.uploaded: list[str] = []
+
+    def upload_video(self, video_file, title, tags, description, privacy_status):
+        self.uploaded.append(video_file)
+        return f"yt-{len(self.uploaded)}"
+
+    def upload_thumbnail(self, video_id, thumbnail_path):
+        return True
+
+
+def start_run(monkeypatch, logger, daily_quota):
+    """Resets the process wide state, as a new run of the program would"""
+    monkeypatch.setattr("src.uploader.ledger._ledger", None)
+    monkeypatch.setattr(
+        "src.uploader.quota._tracker",
+        QuotaTracker(logger, daily_quota, path="quota_usage.json"),
+    )
+
+
+@pytest.fixture
+def rendered_video(workdir):
+    video_dir = workdir / "output" / "renderedvid"
+    video_dir.mkdir(parents=True)
+    (video_dir / "Song 1 Hour looped.mp4").write_bytes(b"rendered video")
+    return video_dir / "Song 1 Hour looped.mp4"
+
+
+def test_deferred_video_is_uploaded_on_next_run(
+    config_loader, logger, workdir, rendered_video, monkeypatch
+):
+    # first run, the quota is already spent
+    start_run(monkeypatch, logger, daily_quota=100)
+    youtube_uploader = FakeYouTubeUploader()
+    Uploader(config_loader, logger, youtube_uploader).start_uploading_to_youtube()
+
+    assert youtube_uploader.uploaded == []
+    assert list(json.loads((workdir / "upload_deferred.json").read_text())) == [
+        "renderedvid"
+    ]
+
+    # next run after the quota reset, with nothing left in the links file
+    start_run(monkeypatch, logger, daily_quota=10000)
+    youtube_uploader = FakeYouTubeUploader()
+    uploader = Uploader(config_loader, logger, youtube_uploader)
+    pipeline = Pipeline(
+        logger=logger,
+        config_loader=config_loader,
+        video_downloader=VideoDownloader(logger=logger, configLoader=config_loader),
+        uploader=uploader,
+    )
+    pipeline.run([])
+
+    assert youtube_uploader.uploaded == [f"output/renderedvid/{rendered_video.name}"]
+    assert uploader.deferred.pending() == []
+    assert uploader.ledger.get_by_source("renderedvid")["video_id"] == "yt-1"
+
+
+class QuotaRefusingUploader(FakeYouTubeUploader):
+    """The API says the quota is spent although the tracker had room"""
+
+    def upload_video(self, video_file, title, tags, description, privacy_status):
+        raise QuotaExceededError(title)
+
+
+def test_quota_refused_upload_is_deferred(
+    config_loader, logger, workdir, rendered_video, monkeypatch
+):
+    start_run(monkeypatch, logger, daily_quota=10000)
+    uploader = Uploader(config_loader, logger, QuotaRefusingUploader())
+    uploader.upload_video_folder("renderedvid")
+
+    assert uploader.deferred.pending() == ["renderedvid"]
+    assert uploader.ledger.get_by_source("renderedvid") is None
+
+
+def test_uploads_follow_the_upload_priority(
+    config_loader, logger, workdir, monkeypatch
+):
+    start_run(monkeypatch, logger, daily_quota=10000)
+    sizes = {"largevideo1": 300, "smallvideo1": 100, "mediumvideo": 200}
+    for video_id, size in sizes.items():
+        video_dir = workdir / "output" / video_id
+        video_dir.mkdir(parents=True)
+        (video_dir / f"{video_id}.mp4").write_bytes(video_id.encode() * size)
+
+    youtube_uploader = FakeYouTubeUploader()
+    uploader = Uploader(config_loader, logger, youtube_uploader)
+    pipeline = Pipeline(
+        logger=logger,
+        config_loader=config_loader,
+        video_downloader=VideoDownloader(logger=logger, configLoader=config_loader),
+        uploader=uploader,
+    )
+    # the titles aren't needed, they're read from the file names
+    monkeypatch.setattr(pipeline.metadata_service, "prefetch", lambda video_ids: None)
+    # stream renders read the titles prefetched by the pipeline
+    assert uploader.metadata_service is pipeline.metadata_service
+    pipeline.run(f"https://youtu.be/{video_id}" for video_id in sizes)
+
+    assert youtube_uploader.uploaded == [
+        f"output/{video_id}/{video_id}.mp4"
+        for video_id in ("smallvideo1", "mediumvideo", "largevideo1")
+    ]
+
+
+def test_upload_queue_hands_out_jobs_by_priority():
+    sizes = {"b": 2, "c": 3, "a": 1}
+    upload_queue = UploadQueue(sizes.get)
+    upload_queue.put("c")
+    upload_queue.put(_STOP)
+    upload_queue.put("b")
+    upload_queue.put("a")
+
+    assert [upload_queue.get() for _ in range(4)] == ["a", "b", "c", _STOP]
+
+
+class FakeCredentials:
+    """Counts refreshes and how many of them ran at once"""
+
+    def __init__(self):
+        self.token = "token-0"
+        self.expiry = None
+        self.refreshes = 0
+        self.running = 0
+        self.max_running = 0
+
+    def refresh(self, request):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        self.refreshes += 1
+        self.token = f"token-{self.refreshes}"
+        self.running -= 1
+
+    def to_json(self):
+        return json.dumps({"token": self.token})
+
+
+def test_worker_refreshes_go_through_the_manager(logger, workdir):
+    credentials = FakeCredentials()
+    manager = CredentialManager(logger, credentials, str(workdir / "token.json"))
+    workers = [
+        threading.Thread(target=LockedCredentials(manager).refresh, args=(None,))
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert credentials.max_running == 1
+    # the workers that waited for the first refresh reuse its token
+    assert credentials.refreshes < len(workers)
+    assert json.loads((workdir / "token.json").read_text()) == {
+        "token": credentials.token
+    }